@@ -7,7 +7,6 @@ from pyUL1741SB import Eut, Env
 import pandas as pd
 
 from pyUL1741SB.IEEE1547 import IEEE1547
-from pyUL1741SB import viz
 
 """
 IEEE 1547.1-2020
@@ -44,9 +43,10 @@ df_es_cases = pd.DataFrame({
 
 class ES(IEEE1547):
     def es_ramp(self, outdir, final):
-        self.validator = viz.Validator('es-ramp')
+        self.validator = self.new_validator('es-ramp')
         try:
             self.es_ramp_proc()
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
@@ -73,7 +73,8 @@ class ES(IEEE1547):
             df_meas = self.meas_perturb(
                 lambda: self.c_env.ac_config(
                     Vac=self.c_eut.VN, freq=self.c_eut.fN, rocof=self.c_eut.rocof()),
-                ntrvl, ntrvl, meas_args
+                ntrvl, ntrvl, meas_args,
+                dct_label={**dct_label, 'step': 'c'}
             )
             self.es_ramp_validate(dct_label, step='c', df_meas=df_meas)
             '''
@@ -95,7 +96,8 @@ class ES(IEEE1547):
             ntrvl = timedelta(seconds=max(60, 2 * df_row['ES delay (s)']))
             df_meas = self.meas_perturb(
                 lambda: self.c_eut.set_es(**dct_es_settings),
-                ntrvl, ntrvl, meas_args
+                ntrvl, ntrvl, meas_args,
+                dct_label={**dct_label, 'step': 'e'}
             )
             self.es_ramp_validate(dct_label, step='e', df_meas=df_meas)
 
@@ -117,7 +119,8 @@ class ES(IEEE1547):
             ntrvl = timedelta(seconds=max(60, 2 * df_row['ES delay (s)']))
             df_meas = self.meas_perturb(
                 perturb,
-                ntrvl, ntrvl, meas_args
+                ntrvl, ntrvl, meas_args,
+                dct_label={**dct_label, 'step': 'h'}
             )
             self.es_ramp_validate(dct_label, step='h', df_meas=df_meas)
             '''
@@ -133,7 +136,8 @@ class ES(IEEE1547):
                 df_meas0 = self.meas_perturb(
                     lambda: self.c_env.ac_config(
                         Vac=vpu * self.c_eut.VN, freq=fhz, rocof=self.c_eut.rocof()),
-                    ntrvl, ntrvl, meas_args
+                    ntrvl, ntrvl, meas_args,
+                    dct_label={**dct_label, 'step': 'i'}
                 )
 
                 vpu = df_row['Initial voltage (p.u.)']
@@ -142,7 +146,8 @@ class ES(IEEE1547):
                 df_meas1 = self.meas_perturb(
                     lambda: self.c_env.ac_config(
                         Vac=vpu * self.c_eut.VN, freq=fhz, rocof=self.c_eut.rocof()),
-                    ntrvl, ntrvl, meas_args
+                    ntrvl, ntrvl, meas_args,
+                    dct_label={**dct_label, 'step': 'i'}
                 )
 
                 self.es_ramp_validate(
@@ -159,7 +164,8 @@ class ES(IEEE1547):
             df_meas = self.meas_perturb(
                 lambda: self.c_env.ac_config(
                     Vac=vpu * self.c_eut.VN, freq=fhz, rocof=self.c_eut.rocof()),
-                ntrvl, ntrvl, meas_args
+                ntrvl, ntrvl, meas_args,
+                dct_label={**dct_label, 'step': 'j'}
             )
             self.es_ramp_validate(dct_label, step='j', df_meas=df_meas,
                                   ntrvl=timedelta(seconds=df_row['ES delay (s)'] + df_row['ES period (ramp) (s)']))
@@ -167,7 +173,8 @@ class ES(IEEE1547):
             ntrvl = timedelta(seconds=2 * 4)
             df_meas = self.meas_perturb(
                 lambda: self.c_eut.set_es(Ena=False),
-                ntrvl, ntrvl, meas_args
+                ntrvl, ntrvl, meas_args,
+                dct_label={**dct_label, 'step': 'k'}
             )
             self.es_ramp_validate(dct_label, step='k',
                                   df_meas=df_meas, ntrvl=timedelta(seconds=2))
@@ -180,7 +187,8 @@ class ES(IEEE1547):
                 ntrvl = timedelta(seconds=5)
                 df_meas = self.meas_perturb(
                     lambda: self.c_eut.set_es(Ena=True),
-                    ntrvl, ntrvl, meas_args
+                    ntrvl, ntrvl, meas_args,
+                    dct_label={**dct_label, 'step': 'l'}
                 )
                 self.es_ramp_validate(dct_label, step='l', df_meas=df_meas)
 
@@ -237,7 +245,7 @@ class ES(IEEE1547):
             dct_crits={},
             start=df_meas.index[0],
             end=df_meas.index[-1],
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'step': step, 'valid': valid}.items()),
+            fields={**dct_label, 'step': step},
+            checks={'valid': valid},
             passed=valid
         )
@@ -2,15 +2,15 @@
 IEEE 1547.1-2020 5.5
 """
 from datetime import timedelta
-from pyUL1741SB import viz
 
 from pyUL1741SB.IEEE1547 import IEEE1547
 
 class FreqDist(IEEE1547):
     def oft(self, outdir, final):
-        self.validator = viz.Validator('oft')
+        self.validator = self.new_validator('oft')
         try:
             self.oft_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -53,6 +53,8 @@ class FreqDist(IEEE1547):
                     '''
                     self.c_eut.set_ft(
                         **{trip_key: {'freq': trip_fhz, 'cts': trip_cts}})
+                    # with trip_fork, repeats restore the settled pre-trip state when the eut supports it
+                    snap = self.snapshot()
                     for i in range(self.trip_rpt):
                         '''
                         d) Set (or verify) EUT parameters to the minimum [maximum] overfrequency trip magnitude setting within the
@@ -63,7 +65,7 @@ class FreqDist(IEEE1547):
                         dct_label = {'proc': 'oft', 'region': trip_key,
                                      'time': trip_cts, 'mag': trip_fhz, 'iter': i}
                         self.oft_validate(dct_label, trip_fhz, trip_cts)
-                        self.trip_rst()
+                        self.trip_restart(snap)
 
     def oft_validate(self, dct_label, trip_fhz, trip_cts):
         """"""
@@ -100,9 +102,10 @@ class FreqDist(IEEE1547):
         self.trip_step(dct_label, dur, tMRA, step0, step1, meas_args)
 
     def uft(self, outdir, final):
-        self.validator = viz.Validator('uft')
+        self.validator = self.new_validator('uft')
         try:
             self.uft_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -146,6 +149,8 @@ class FreqDist(IEEE1547):
                     '''
                     self.c_eut.set_ft(
                         **{trip_key: {'freq': trip_fhz, 'cts': trip_cts}})
+                    # with trip_fork, repeats restore the settled pre-trip state when the eut supports it
+                    snap = self.snapshot()
                     for i in range(self.trip_rpt):
                         '''
                         d) Set (or verify) EUT parameters to the minimum underfrequency trip magnitude setting within
@@ -162,7 +167,7 @@ class FreqDist(IEEE1547):
                         dct_label = {'proc': 'uft', 'region': trip_key,
                                      'time': trip_cts, 'mag': trip_fhz, 'iter': i}
                         self.uft_validate(dct_label, trip_fhz, trip_cts)
-                        self.trip_rst()
+                        self.trip_restart(snap)
 
     def uft_validate(self, dct_label, trip_fhz, trip_cts):
         """"""
@@ -199,9 +204,10 @@ class FreqDist(IEEE1547):
         self.trip_step(dct_label, dur, tMRA, step0, step1, meas_args)
 
     def hfrt(self, outdir, final):
-        self.validator = viz.Validator('hfrt')
+        self.validator = self.new_validator('hfrt')
         try:
             self.hfrt_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -310,9 +316,10 @@ class FreqDist(IEEE1547):
         self.frt_validate(dct_label, perturbation, ntrvl)
 
     def lfrt(self, outdir, final):
-        self.validator = viz.Validator('lfrt')
+        self.validator = self.new_validator('lfrt')
         try:
             self.lfrt_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -422,16 +429,16 @@ class FreqDist(IEEE1547):
     def frt_validate(self, dct_label, perturbation, ntrvl):
         """"""
         df_meas = self.meas_perturb(
-            perturbation, ntrvl, ntrvl, ('P', 'Q', 'V', 'F'))
-        valid = ((df_meas.loc[:, 'P'] - self.c_eut.Prated)
-                 < self.mra_scale * self.c_eut.mra.static.P).all()
+            perturbation, ntrvl, ntrvl, ('P', 'Q', 'V', 'F'), dct_label=dct_label)
+        p_max = self.c_eut.Prated + self.mra_scale * self.c_eut.mra.static.P
+        valid = (df_meas.loc[:, 'P'] < p_max).all()
 
         self.validator.record_epoch(
             df_meas=df_meas,
             dct_crits={},
             start=df_meas.index[0],
             end=df_meas.index[-1],
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'valid': valid}.items()),
+            fields=dct_label,
+            checks={'valid': (valid, self.margin(df_meas['P'].max(), y_max=p_max))},
             passed=valid
         )
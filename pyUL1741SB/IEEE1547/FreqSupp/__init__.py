@@ -8,7 +8,6 @@ import numpy as np
 import pandas as pd
 
 from pyUL1741SB.IEEE1547 import IEEE1547
-from pyUL1741SB import viz
 
 
 class FWChar:
@@ -21,31 +20,22 @@ class FWChar:
 
     def y_of_x(self, x, ymin, yn, ymax):
         """
-        :param x: frequency in Hz
+        :param x: frequency in Hz, scalar or array
         :param ymin: eut minimum capable y, p.u.
         :param yn: y setpoint (p.u. at x within deadband)
         :param ymax: eut available y, p.u.
         :return: y (active power p.u.) at x (frequency, Hz)
         """
-        def of_region():
-            crv = yn - ((x - 60 - self.dbof_hz) / 60 / self.kof)
-            return max(ymin, crv)
-
-        def uf_region():
-            crv = yn + ((60 - self.dbuf_hz - x) / 60 / self.kuf)
-            return min(ymax, crv)
+        x = np.asarray(x)
         df = x - 60
-        if df < 0:  # UF
-            df = abs(df)
-            if df < self.dbuf_hz:
-                return yn
-            else:
-                return uf_region()
-        else:  # OF
-            if df < self.dbof_hz:
-                return yn
-            else:
-                return of_region()
+        of = yn - ((x - 60 - self.dbof_hz) / 60 / self.kof)
+        uf = yn + ((60 - self.dbuf_hz - x) / 60 / self.kuf)
+        y = np.where(
+            df < 0,
+            np.where(-df < self.dbuf_hz, yn, np.minimum(ymax, uf)),  # UF
+            np.where(df < self.dbof_hz, yn, np.maximum(ymin, of)),  # OF
+        )
+        return y[()]
 
     @staticmethod
     def CatI_CharI(): return FWChar(
@@ -87,9 +77,10 @@ delta_fsmall = delta_Psmall * fN * kOF
 
 class FreqSupp(IEEE1547):
     def fwo(self, outdir, final):
-        self.validator = viz.Validator('fwo')
+        self.validator = self.new_validator('fwo')
         try:
             self.fwo_proc()
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
@@ -207,9 +198,10 @@ class FreqSupp(IEEE1547):
         return ret
 
     def fwu(self, outdir, final):
-        self.validator = viz.Validator('fwu')
+        self.validator = self.new_validator('fwu')
         try:
             self.fwu_proc()
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
@@ -335,15 +327,16 @@ class FreqSupp(IEEE1547):
         # need to apply different validation depending on DeltaPsmall/large
         # assume criteria for deltaPsmall for all steps, more stringent criteria
         df_meas = self.meas_perturb(
-            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'))
+            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'), step_resp=True, dct_label=dct_label)
 
-        t_init, t_olrt, t_ss0, t_ss1 = self.ts_of_interest(df_meas.index, olrt)
+        p_init, p_olrt, p_ss0, p_ss1 = df_meas.ts_of_interest(olrt)
+        t_init, t_olrt, t_ss0, t_ss1 = df_meas.ts(p_init, p_olrt, p_ss0, p_ss1)
         # get y_init
-        y_init = df_meas.loc[t_init, yarg]
-        y_olrt = df_meas.loc[t_olrt, yarg]
+        y_init = df_meas.at(yarg, p_init)
+        y_olrt = df_meas.at(yarg, p_olrt)
         # determine y_ss by average after olrt
-        x_ss = df_meas.loc[t_ss0:, xarg].mean()
-        y_ss = df_meas.loc[t_ss0:, yarg].mean()
+        x_ss = df_meas.mean(xarg, p_ss0)
+        y_ss = df_meas.mean(yarg, p_ss0)
         '''
         [...] the EUT shall reach 90% × (Qfinal – Qinitial) + Qinitial within 1.5*MRA at olrt within 1.5*MRA 
         '''
@@ -371,9 +364,16 @@ class FreqSupp(IEEE1547):
                     'max': [y_init, y_olrt_max, y_ss_max, y_ss_max],
                 }).set_index('ts'),
             },
+            dct_envs={
+                'P': self.step_envelope(df_meas, olrt, y_init, y_ss, tMRA, yMRA,
+                                        (y_ss_min, y_ss_target, y_ss_max)),
+            },
             start=t_init,
             end=t_ss1,
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'olrt_valid': olrt_valid, 'ss_valid': ss_valid}.items()),
+            fields=dct_label,
+            checks={
+                'olrt_valid': (olrt_valid, self.margin(y_olrt, y_olrt_min, y_olrt_max)),
+                'ss_valid': (ss_valid, self.margin(y_ss, y_ss_min, y_ss_max)),
+            },
             passed=olrt_valid and ss_valid
         )
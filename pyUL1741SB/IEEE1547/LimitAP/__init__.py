@@ -1,20 +1,21 @@
 from datetime import timedelta
 
+import numpy as np
 import pandas as pd
 
 from pyUL1741SB.IEEE1547 import IEEE1547
 from pyUL1741SB.IEEE1547.FreqSupp import FWChar
 from pyUL1741SB.IEEE1547.VoltReg.vw import VWCurve
-from pyUL1741SB import viz
 
 proc = 'lap'
 
 
 class LAP(IEEE1547):
     def lap(self, outdir, final):
-        self.validator = viz.Validator(proc)
+        self.validator = self.new_validator(proc)
         try:
             self.lap_proc()
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
@@ -81,7 +82,7 @@ class LAP(IEEE1547):
                 '''
                 # b)
                 self.c_eut.set_aap(spu=1)
-                self.c_env.sleep(timedelta(seconds=self.c_eut.olrt.lap))
+                self.settle(timedelta(seconds=self.c_eut.olrt.lap))
 
                 def y_of_fw(x):
                     if self.c_eut.Prated_prime < 0:
@@ -94,7 +95,7 @@ class LAP(IEEE1547):
 
                 def y_of_vw(x):
                     vw_val = dflt_vwcrv.y_of_x(x) * self.c_eut.Prated
-                    return min(vw_val, aplim_pu * self.c_eut.Prated)
+                    return np.minimum(vw_val, aplim_pu * self.c_eut.Prated)
 
                 dct_steps = {
                     'c': {
@@ -198,14 +199,16 @@ class LAP(IEEE1547):
         yMRA = self.c_eut.mra.static.P
         def perturbation(): return set_x(x)
         df_meas = self.meas_perturb(
-            perturbation, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'))
-        t_init, t_olrt, t_ss0, t_ss1 = self.ts_of_interest(df_meas.index, olrt)
+            perturbation, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'), step_resp=True, dct_label=dct_label)
+        p_init, p_olrt, p_ss0, p_ss1 = df_meas.ts_of_interest(olrt)
+        t_init, t_olrt, t_ss0, t_ss1 = df_meas.ts(p_init, p_olrt, p_ss0, p_ss1)
 
         y_ss_target = y_of_x(x)
         y_ss_min, y_ss_max = self.range_4p2(y_of_x, x, xMRA, yMRA)
 
-        y_ss = df_meas.loc[t_ss0:, yarg].mean()
+        y_ss = df_meas.mean(yarg, p_ss0)
         ss_valid = y_ss_min <= y_ss <= y_ss_max
+        tMRA = self.c_eut.mra.static.T(olrt.total_seconds())
 
         self.validator.record_epoch(
             df_meas=df_meas,
@@ -217,9 +220,13 @@ class LAP(IEEE1547):
                     'max': [y_ss_max] * 4,
                 }).set_index('ts'),
             },
+            dct_envs={
+                'P': self.step_envelope(df_meas, olrt, df_meas.at(yarg, p_init), y_ss, tMRA, yMRA,
+                                        (y_ss_min, y_ss_target, y_ss_max)),
+            },
             start=t_init,
             end=t_ss1,
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'ss_valid': ss_valid}.items()),
+            fields=dct_label,
+            checks={'ss_valid': (ss_valid, self.margin(y_ss, y_ss_min, y_ss_max))},
             passed=ss_valid
         )
@@ -3,15 +3,15 @@ IEEE 1547.1-2020 5.16
 """
 from datetime import timedelta
 from typing import Callable
-from pyUL1741SB import Eut, Env
 from pyUL1741SB.IEEE1547 import IEEE1547
 from pyUL1741SB.IEEE1547.FreqSupp import FWChar
 from pyUL1741SB.IEEE1547.VoltReg.vw import VWCurve
 from pyUL1741SB.IEEE1547.VoltReg.vv import VVCurve
 from pyUL1741SB.IEEE1547.VoltReg.wv import WVCurve
-from pyUL1741SB import viz
 
+import numpy as np
 import pandas as pd
+from pyUL1741SB.meas import td_ns
 
 
 class RespPri(IEEE1547):
@@ -79,9 +79,10 @@ class RespPri(IEEE1547):
         return pd.DataFrame(data).set_index('step')
 
     def pri(self, outdir, final):
-        self.validator = viz.Validator('pri')
+        self.validator = self.new_validator('pri')
         try:
             self.pri_proc()
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
@@ -177,7 +178,7 @@ class RespPri(IEEE1547):
             j) Measure ac test source voltage and frequency, and the EUT’s active and reactive power production.
             '''
             self.c_eut.set_lap(Ena=True, pu=0.5)
-            self.c_env.sleep(timedelta(seconds=self.c_eut.olrt.lap))
+            self.settle(timedelta(seconds=self.c_eut.olrt.lap))
             # meas vac, fac, p, q
             '''
             n) Repeat steps k) through m) for the rest of the steps in Table 38 or Table 39, depending on the
@@ -251,8 +252,9 @@ class RespPri(IEEE1547):
         """
         # meas vac, fac, p, q
         df_meas = self.meas_perturb(
-            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'))
-        row_ss = df_meas.loc[df_meas.index[0] + olrt:, :].mean()
+            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'), step_resp=True, dct_label=dct_label)
+        p_ss = int(np.searchsorted(df_meas.t, df_meas.t[0] + td_ns(olrt)))
+        row_ss = {c: df_meas.mean(c, p_ss) for c in df_meas.cols}
         p_target = df_steprow['e_ap_pu'] * self.c_eut.Prated
 
         # ap validation
@@ -273,8 +275,7 @@ class RespPri(IEEE1547):
             q_of_x, row_ss[qx], qxMRA, self.c_eut.mra.static.Q)
         q_valid = qmin < row_ss['Q'] < qmax
 
-        t_start = df_meas.index[0]
-        t_end = df_meas.index[-1]
+        t_start, t_end = df_meas.ts(0, len(df_meas) - 1)
         self.validator.record_epoch(
             df_meas=df_meas,
             dct_crits={
@@ -293,8 +294,11 @@ class RespPri(IEEE1547):
             },
             start=t_start,
             end=t_end,
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'p_valid': p_valid, 'q_valid': q_valid}.items()),
+            fields=dct_label,
+            checks={
+                'p_valid': (p_valid, self.margin(row_ss['P'], pmin, pmax)),
+                'q_valid': (q_valid, self.margin(row_ss['Q'], qmin, qmax)),
+            },
             passed=p_valid and q_valid
         )
 
@@ -10,7 +10,6 @@ from pyUL1741SB.IEEE1547.FreqSupp import FWChar
 from pyUL1741SB.IEEE1547 import IEEE1547
 from pyUL1741SB.IEEE1547.VoltReg.vv import VVCurve
 from pyUL1741SB import Eut, Env
-from pyUL1741SB import viz
 
 
 """
@@ -103,9 +102,10 @@ class VoltDist(IEEE1547):
     OpMdkey = 'OpMd'
 
     def ovt(self, outdir, final):
-        self.validator = viz.Validator('ovt')
+        self.validator = self.new_validator('ovt')
         try:
             self.ovt_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -160,6 +160,8 @@ class VoltDist(IEEE1547):
                     '''
                     self.c_eut.set_vt(
                         **{trip_key: {'vpu': trip_vpu, 'cts': trip_cts}})
+                    # with trip_fork, repeats restore the settled pre-trip state when the eut supports it
+                    snap = self.snapshot()
                     for i in range(self.trip_rpt):
                         '''
                         e), f)
@@ -167,7 +169,7 @@ class VoltDist(IEEE1547):
                         dct_label = {'proc': 'ovt', 'region': trip_key,
                                      'time': trip_cts, 'mag': trip_vpu, 'iter': i}
                         self.ovt_validate(dct_label, trip_cts, trip_vpu)
-                        self.trip_rst()
+                        self.trip_restart(snap)
 
     def ovt_validate(self, dct_label, trip_cts, trip_vpu):
         """"""
@@ -208,9 +210,10 @@ class VoltDist(IEEE1547):
         self.trip_step(dct_label, dur, tMRA, step0, step1, meas_args)
 
     def uvt(self, outdir, final):
-        self.validator = viz.Validator('uvt')
+        self.validator = self.new_validator('uvt')
         try:
             self.uvt_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -268,6 +271,8 @@ class VoltDist(IEEE1547):
                     '''
                     self.c_eut.set_vt(
                         **{trip_key: {'vpu': trip_vpu, 'cts': trip_cts}})
+                    # with trip_fork, repeats restore the settled pre-trip state when the eut supports it
+                    snap = self.snapshot()
                     for i in range(self.trip_rpt):
                         '''
                         e) Record applicable settings.
@@ -283,7 +288,7 @@ class VoltDist(IEEE1547):
                         dct_label = {'proc': 'uvt', 'region': trip_key,
                                      'time': trip_cts, 'mag': trip_vpu, 'iter': i}
                         self.uvt_validate(dct_label, trip_cts, trip_vpu)
-                        self.trip_rst()
+                        self.trip_restart(snap)
 
     def uvt_validate(self, dct_label, trip_cts, trip_vpu):
         """"""
@@ -316,9 +321,10 @@ class VoltDist(IEEE1547):
         self.trip_step(dct_label, dur, tMRA, step0, step1, meas_args)
 
     def lvrt(self, outdir, final):
-        self.validator = viz.Validator('lvrt')
+        self.validator = self.new_validator('lvrt')
         try:
             self.lvrt_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -417,7 +423,7 @@ class VoltDist(IEEE1547):
 
         def perturb():
             self.c_env.ac_config(Vac=cond.vpu * self.c_eut.VN)
-        df_meas = self.meas_perturb(perturb, ntrvl, ntrvl, meas_args)
+        df_meas = self.meas_perturb(perturb, ntrvl, ntrvl, meas_args, dct_label=dct_label)
         resp_idx = df_meas.index.asof(df_meas.index[0] + resptm)
 
         def contop_valid():
@@ -467,15 +473,16 @@ class VoltDist(IEEE1547):
             dct_crits={},
             start=df_meas.index[0],
             end=df_meas.index[-1],
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'valid': valid}.items()),
+            fields=dct_label,
+            checks={'valid': valid},
             passed=valid
         )
 
     def hvrt(self, outdir, final):
-        self.validator = viz.Validator('hvrt')
+        self.validator = self.new_validator('hvrt')
         try:
             self.hvrt_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -557,7 +564,7 @@ class VoltDist(IEEE1547):
         def perturb():
             self.c_env.ac_config(Vac=cond.vpu * self.c_eut.VN)
 
-        df_meas = self.meas_perturb(perturb, ntrvl, ntrvl, meas_args)
+        df_meas = self.meas_perturb(perturb, ntrvl, ntrvl, meas_args, dct_label=dct_label)
         resp_idx = df_meas.index.asof(df_meas.index[0] + resptm)
 
         def contop_valid():
@@ -590,8 +597,8 @@ class VoltDist(IEEE1547):
             dct_crits={},
             start=df_meas.index[0],
             end=df_meas.index[-1],
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'valid': valid}.items()),
+            fields=dct_label,
+            checks={'valid': valid},
             passed=valid
         )
 
@@ -9,20 +9,21 @@ class VoltReg(IEEE1547):
     def vv_wv_step_validate(self, dct_label: dict, perturb: Callable, xarg, yarg, y_of_x: Callable,
                             olrt: timedelta, xMRA, yMRA):
         df_meas = self.meas_perturb(
-            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'))
+            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'), step_resp=True, dct_label=dct_label)
         self.vv_wv_validate(dct_label, df_meas, olrt,
                             y_of_x, xarg, yarg, xMRA, yMRA)
 
     def vv_wv_validate(self, dct_label: dict, df_meas, olrt: timedelta, y_of_x: Callable, xarg, yarg, xMRA, yMRA):
         # get y_init
         tMRA = self.c_eut.mra.static.T(olrt.total_seconds())
-        t_init, t_olrt, t_ss0, t_ss1 = self.ts_of_interest(df_meas.index, olrt)
+        p_init, p_olrt, p_ss0, p_ss1 = df_meas.ts_of_interest(olrt)
+        t_init, t_olrt, t_ss0, t_ss1 = df_meas.ts(p_init, p_olrt, p_ss0, p_ss1)
 
-        y_init = df_meas.loc[t_init, yarg]
-        y_olrt = df_meas.loc[t_olrt, yarg]
+        y_init = df_meas.at(yarg, p_init)
+        y_olrt = df_meas.at(yarg, p_olrt)
         # determine y_ss by average after olrt
-        x_ss = df_meas.loc[t_ss0:, xarg].mean()
-        y_ss = df_meas.loc[t_ss0:, yarg].mean()
+        x_ss = df_meas.mean(xarg, p_ss0)
+        y_ss = df_meas.mean(yarg, p_ss0)
         '''
         [...] the EUT shall reach 90% × (Qfinal – Qinitial) + Qinitial within 1.5*MRA at olrt within 1.5*MRA 
         '''
@@ -50,22 +51,30 @@ class VoltReg(IEEE1547):
                     'max': [y_init, y_olrt_max, y_ss_max, y_ss_max],
                 }).set_index('ts'),
             },
+            dct_envs={
+                'Q': self.step_envelope(df_meas, olrt, y_init, y_ss, tMRA, yMRA,
+                                        (y_ss_min, y_ss_target, y_ss_max)),
+            },
             start=t_init,
             end=t_ss1,
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'olrt_valid': olrt_valid, 'ss_valid': ss_valid}.items()),
+            fields=dct_label,
+            checks={
+                'olrt_valid': (olrt_valid, self.margin(y_olrt, y_olrt_min, y_olrt_max)),
+                'ss_valid': (ss_valid, self.margin(y_ss, y_ss_min, y_ss_max)),
+            },
             passed=olrt_valid and ss_valid
         )
 
     def cpf_crp_validate(self, dct_label: dict, df_meas, olrt: timedelta, y_of_x: Callable[[float], float]):
         xarg, yarg = 'P', 'Q'
         yMRA = self.c_eut.mra.static.Q
-        t_init, t_olrt, t_ss0, t_ss1 = self.ts_of_interest(df_meas.index, olrt)
+        p_init, p_olrt, p_ss0, p_ss1 = df_meas.ts_of_interest(olrt)
+        t_init, t_olrt, t_ss0, t_ss1 = df_meas.ts(p_init, p_olrt, p_ss0, p_ss1)
 
-        y_init = df_meas.loc[t_init, yarg]
-        y_olrt = df_meas.loc[t_olrt, yarg]
-        x_ss = df_meas.loc[t_ss0:, xarg].mean()
-        y_ss = df_meas.loc[t_ss0:, yarg].mean()
+        y_init = df_meas.at(yarg, p_init)
+        y_olrt = df_meas.at(yarg, p_olrt)
+        x_ss = df_meas.mean(xarg, p_ss0)
+        y_ss = df_meas.mean(yarg, p_ss0)
         '''
         [...] the EUT shall reach 90% × (Qfinal – Qinitial) + Qinitial within 10 s after a voltage or power step.
          Q shall reach Qini + 0.9 * (Qfin - Qini) in a time of 10s or less
@@ -104,10 +113,17 @@ class VoltReg(IEEE1547):
                     'max': [y_init, y_olrt_max, y_ss_max, y_ss_max],
                 }).set_index('ts'),
             },
+            dct_envs={
+                'Q': self.step_envelope(df_meas, olrt, y_init, y_ss, 0, yMRA,
+                                        (y_ss_min, y_ss_target, y_ss_max), widen=True),
+            },
             start=t_init,
             end=t_ss1,
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'olrt_valid': olrt_valid, 'ss_valid': ss_valid}.items()),
+            fields=dct_label,
+            checks={
+                'olrt_valid': (olrt_valid, self.margin(y_olrt, y_olrt_min, y_olrt_max)),
+                'ss_valid': (ss_valid, self.margin(y_ss, y_ss_min, y_ss_max)),
+            },
             passed=olrt_valid and ss_valid
         )
 
@@ -120,5 +136,5 @@ class VoltReg(IEEE1547):
         slabel = ''.join([f'{k}: {v}; ' for k, v in dct_label.items()])
         self.c_env.log(msg=f"1741SB {slabel}")
         df_meas = self.meas_perturb(
-            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'))
+            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'), step_resp=True, dct_label=dct_label)
         self.cpf_crp_validate(dct_label, df_meas, olrt, y_of_x)
@@ -2,7 +2,6 @@ from datetime import timedelta
 
 from typing import Callable
 import math
-from pyUL1741SB import viz
 
 from pyUL1741SB.IEEE1547.VoltReg import VoltReg
 
@@ -11,9 +10,10 @@ proc = 'cpf'
 
 class CPF(VoltReg):
     def cpf(self, outdir, final):
-        self.validator = viz.Validator(proc)
+        self.validator = self.new_validator(proc)
         try:
             self.cpf_proc()
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
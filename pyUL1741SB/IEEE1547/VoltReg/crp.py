@@ -2,7 +2,6 @@ from datetime import timedelta
 from pyUL1741SB import Eut, Env
 
 from typing import Callable
-from pyUL1741SB import viz
 from pyUL1741SB.IEEE1547.VoltReg import VoltReg
 import pandas as pd
 
@@ -11,9 +10,10 @@ proc = 'crp'
 
 class CRP(VoltReg):
     def crp(self, outdir, final):
-        self.validator = viz.Validator(proc)
+        self.validator = self.new_validator(proc)
         try:
             self.crp_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -1,11 +1,9 @@
 from datetime import timedelta
 from typing import Callable
-from pyUL1741SB import Eut, Env
+from pyUL1741SB import Eut
 import numpy as np
-import pandas as pd
 
 from pyUL1741SB.IEEE1547.VoltReg import VoltReg
-from pyUL1741SB import viz
 
 
 class VVCurve:
@@ -91,17 +89,19 @@ class VVCurve:
 
 class VV(VoltReg):
     def vv_char1(self, outdir, final):
-        self.validator = viz.Validator('vv-char1')
+        self.validator = self.new_validator('vv-char1')
         try:
             self.vv_proc(char_crvs=(1,), pwr_pus=(1.0, 0.2, 0.66))
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
 
     def vv_char23(self, outdir, final):
-        self.validator = viz.Validator('vv-char23')
+        self.validator = self.new_validator('vv-char23')
         try:
             self.vv_proc(char_crvs=(2, 3), pwr_pus=(1.0,))
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
@@ -164,7 +164,7 @@ class VV(VoltReg):
                 '''
                 self.c_eut.set_vv(Ena=True, crv=vv_crv)
                 dct_vvsteps = self.vv_traverse_steps(vv_crv, self.c_eut.VL, self.c_eut.VH, av)
-                self.c_env.sleep(timedelta(seconds=vv_crv.Tr * 2))
+                self.settle(timedelta(seconds=vv_crv.Tr * 2))
                 for stepname, vac in dct_vvsteps.items():
                     dct_label = {
                         'proc': 'vv', 'pwr': f'{pwr:.0f}', 'crv': f'{crv_name}', 'step': f'{stepname}'
@@ -257,9 +257,10 @@ class VV(VoltReg):
             dct_label, perturb, xarg, yarg, y_of_x, olrt, xMRA, yMRA)
 
     def vv_vref(self, outdir, final, **kwargs):
-        self.validator = viz.Validator('vv-vref')
+        self.validator = self.new_validator('vv-vref')
         try:
             self.vv_vref_proc()
+            self.validator.complete()
         finally:
             final()
             self.validator.draw_new(outdir)
@@ -367,21 +368,24 @@ class VV(VoltReg):
 
         t_step = timedelta(
             seconds=self.c_eut.mra.static.T(olrt.total_seconds()))
-        resp, valids = [], []
-        resp.append(self.c_env.meas_single(*meas_args))
-        ts = self.c_env.time_now()
-        perturb()
-        while not self.c_env.elapsed_since(1.5 * olrt, ts):
-            self.c_env.sleep(t_step)
-            meas = self.c_env.meas_single(*meas_args)
-            if is_valid(meas.loc[meas.index[0], 'Q']):
-                valids.append(True)
-            else:
-                valids = []
-            resp.append(meas)
-            if len(valids) > 10:  # 30 seconds at 300s Tr, 60 seconds at 5000s Tr
-                break
-        df_meas = pd.concat(resp)
+        mbuf = self.c_env.mbuf
+        df_meas = self.replay(perturb, dct_label)
+        if df_meas is None:
+            valids = []
+            i0 = self.c_env.meas_row(*meas_args)
+            ts = self.c_env.time_now()
+            perturb()
+            while not self.c_env.elapsed_since(1.5 * olrt, ts):
+                self.c_env.sleep(t_step)
+                i = self.c_env.meas_row(*meas_args)
+                if is_valid(mbuf.data[yarg][i]):
+                    valids.append(True)
+                else:
+                    valids = []
+                if len(valids) > 10:  # 30 seconds at 300s Tr, 60 seconds at 5000s Tr
+                    break
+            df_meas = mbuf.df(i0, len(mbuf), meas_args)
+            self.validator.note_meas(df_meas)
 
         crit1 = df_meas.loc[df_meas.index[-10]:, 'Q'].apply(is_valid).all()
         crit2 = (df_meas.index[-10] - df_meas.index[0]
@@ -395,7 +399,7 @@ class VV(VoltReg):
             dct_crits={},
             start=df_meas.index[0],
             end=df_meas.index[-1],
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'valid': crit1 and crit2, }.items()),
+            fields=dct_label,
+            checks={'valid': crit1 and crit2},
             passed=crit1 and crit2
         )
@@ -4,7 +4,6 @@ from datetime import timedelta
 
 from pyUL1741SB import Eut, Env
 from pyUL1741SB.IEEE1547.VoltReg import VoltReg
-from pyUL1741SB import viz
 
 import pandas as pd
 
@@ -126,25 +125,28 @@ class VWCurve:
 proc = 'vw'
 class VW(VoltReg):
     def vw_1pu(self, outdir, final):
-        self.validator = viz.Validator('vw-1pu')
+        self.validator = self.new_validator('vw-1pu')
         try:
             self.vw_proc(pwr_pus=(1.0,))
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
 
     def vw_pu66(self, outdir, final):
-        self.validator = viz.Validator('vw-pu66')
+        self.validator = self.new_validator('vw-pu66')
         try:
             self.vw_proc(pwr_pus=(0.66,))
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
 
     def vw_pu20(self, outdir, final):
-        self.validator = viz.Validator('vw-pu20')
+        self.validator = self.new_validator('vw-pu20')
         try:
             self.vw_proc(pwr_pus=(0.2,))
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -298,16 +300,17 @@ class VW(VoltReg):
         xarg, yarg = 'V', 'P'
 
         df_meas = self.meas_perturb(
-            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'))
+            perturb, olrt, 4 * olrt, ('P', 'Q', 'V', 'F'), step_resp=True, dct_label=dct_label)
 
         # get y_init
-        t_init, t_olrt, t_ss0, t_ss1 = self.ts_of_interest(df_meas.index, olrt)
+        p_init, p_olrt, p_ss0, p_ss1 = df_meas.ts_of_interest(olrt)
+        t_init, t_olrt, t_ss0, t_ss1 = df_meas.ts(p_init, p_olrt, p_ss0, p_ss1)
 
-        y_init = df_meas.loc[t_init, yarg]
-        y_olrt = df_meas.loc[t_olrt, yarg]
+        y_init = df_meas.at(yarg, p_init)
+        y_olrt = df_meas.at(yarg, p_olrt)
         # determine y_ss by average after olrt
-        x_ss = df_meas.loc[t_ss0:, xarg].mean()
-        y_ss = df_meas.loc[t_ss0:, yarg].mean()
+        x_ss = df_meas.mean(xarg, p_ss0)
+        y_ss = df_meas.mean(yarg, p_ss0)
         '''
         P(tr) at olrt +/- 1.5 tMRA [...] shall be not more than 0.9 * (Pfinal - Pinitial) + Pinitial + 1.5 * pMRA
         '''
@@ -325,6 +328,9 @@ class VW(VoltReg):
         y_ss_min, y_ss_max = self.range_4p2(y_of_x, x_ss, xMRA, yMRA)
         y_ss_min = self.c_eut.Prated_prime
         ss_valid = y_ss <= y_ss_max
+        # only upper bounds are criteria, the band floor is the eut's minimum power
+        _, y_env_targ, y_env_max = self.step_envelope(
+            df_meas, olrt, y_init, y_ss, tMRA, yMRA, (y_ss_min, y_ss_target, y_ss_max))
 
         self.validator.record_epoch(
             df_meas=df_meas,
@@ -336,9 +342,13 @@ class VW(VoltReg):
                     'max': [y_init, y_olrt_max, y_ss_max, y_ss_max],
                 }).set_index('ts'),
             },
+            dct_envs={'P': (np.full(len(df_meas), y_ss_min), y_env_targ, y_env_max)},
             start=t_init,
             end=t_ss1,
-            label=''.join(f"{k}: {v}; " for k, v in {
-                          **dct_label, 'olrt_valid': olrt_valid, 'ss_valid': ss_valid}.items()),
+            fields=dct_label,
+            checks={
+                'olrt_valid': (olrt_valid, self.margin(y_olrt, y_max=y_olrt_max)),
+                'ss_valid': (ss_valid, self.margin(y_ss, y_max=y_ss_max)),
+            },
             passed=olrt_valid and ss_valid
         )
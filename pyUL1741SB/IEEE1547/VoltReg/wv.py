@@ -3,7 +3,6 @@ from datetime import timedelta
 from typing import Callable
 from pyUL1741SB import Eut, Env
 from pyUL1741SB.IEEE1547.VoltReg import VoltReg
-from pyUL1741SB import viz
 
 
 class WVCurve:
@@ -108,9 +107,10 @@ proc = 'wv'
 
 class WV(VoltReg):
     def wv(self, outdir, final):
-        self.validator = viz.Validator(proc)
+        self.validator = self.new_validator(proc)
         try:
             self.wv_proc()
+            self.validator.complete()
             final()
         finally:
             self.validator.draw_new(outdir)
@@ -0,0 +1,340 @@
+"""
+IEEE 1547.1-2020 5.13, the base of the procedure mixins
+"""
+from typing import Callable
+from datetime import timedelta
+import numpy as np
+from pyUL1741SB import Eut, Env
+from pyUL1741SB.meas import td_ns, EpochView
+from pyUL1741SB.capture import MeasStore
+from pyUL1741SB.IEEE1547 import crit
+from pyUL1741SB import viz
+
+dct_esfast = {
+    'Ena': True,
+    'esDelay': 1.0,
+    'esPeriod': 0.0,
+    'esVpuHi': 1.06,
+    'esVpuLo': 0.88,
+    'esfHzHi': 61,
+    'esfHzLo': 59,
+}
+
+class IEEE1547:
+    def __init__(self, env: Env, eut: Eut):
+        self.c_env = env
+        self.c_eut = eut
+
+        self.mra_scale = 1.5  # 1.5 in standard
+        self.trip_rpt = 5  # 5 in standard
+        self.ss_early_stop = False  # end step response windows once steady state is proven, see meas_settle
+        self.settled = {}  # eut settle key -> snapshot, see settle
+        self.trip_fork = False  # trip repeats restore the pre-trip state instead of trip_rst, see trip_restart
+        # passed to viz.Validator, i.e. checkpoint='results/' to persist and resume. 'store': MeasStore kwargs, i.e.
+        # {'capture': 'results/'}. 'report': Report kwargs, i.e. {'renderer': viz.Renderer()} to draw reports in the
+        # background, None for no report
+        self.validator_opts = {}
+        self.resync = None  # settling time owed after replayed steps, see replay
+        self.adaptive_sampling = False  # sample step responses densely only where criteria read, see sample_offsets
+
+    def set_esfast(self):
+        # make enter service fast so that test go fast
+        self.c_eut.set_es(**dct_esfast)
+
+    def expapp(self, olrt, t, y0, y1):
+        '''
+        :param olrt: response time in seconds
+        :param t: time argument, scalar or array
+        :param y0: initial value
+        :param y1: final value
+        :return: y(t), where y is exp approach from y0 to y1
+        '''
+        return crit.expapp(olrt, t, y0, y1)
+
+    def range_4p2(self, y_of_x, x, xMRA, yMRA):
+        """"""
+        '''
+        IEEE 1547.1-2020 4.2
+        '''
+        return crit.range_4p2(y_of_x, x, xMRA, yMRA, self.mra_scale)
+
+    def margin(self, y, y_min=-np.inf, y_max=np.inf):
+        # distance to the nearest bound of a check, negative when it failed
+        return crit.margin(y, y_min, y_max)
+
+    def step_envelope(self, view: EpochView, olrt: timedelta, y_init, y_ss, tMRA, yMRA, ss, widen=False):
+        """
+        tolerance band of a step response at every sample, companion of the four point criteria frame:
+        y_init before the step, the exp approach from y_init to y_ss with 4.2 tolerance on t up to t_ss0,
+        the steady state band after
+        :param view: the step response, the step is taken at row 1 as in EpochView.ts_of_interest
+        :param ss: (min, targ, max) steady state band
+        :param widen: the transient band also covers the steady state band, as cpf/crp olrt criteria do
+        :return: (min, targ, max) arrays, one value per sample
+        """
+        p_init, p_olrt, p_ss0, p_ss1 = view.ts_of_interest(olrt)
+        y_min, y_targ, y_max = crit.expapp_envelope(
+            view.t_rel(), olrt.total_seconds(), y_init, y_ss, tMRA, yMRA, self.mra_scale)
+        if widen:
+            y_min, y_max = np.minimum(y_min, ss[0]), np.maximum(y_max, ss[2])
+        pos = np.arange(len(view))
+        return tuple(
+            np.where(pos == p_init, y_init, np.where(pos >= p_ss0, y_ss_k, y_k))
+            for y_k, y_ss_k in zip((y_min, y_targ, y_max), ss)
+        )
+
+    def meas_perturb(self, perturb: Callable, olrt: timedelta, interval: timedelta, meas_args: tuple,
+                     step_resp=False, dct_label=None):
+        """
+        :param dct_label: step the measurement is for, identifies it for checkpoint replay
+        :param step_resp: window is a step response evaluated at EpochView.ts_of_interest,
+            allows self.ss_early_stop (takes precedence) and self.adaptive_sampling to apply
+        :return: df_meas, an EpochView for step responses.
+            attrs['stop'] holds why measurement stopped when early stop applied
+        """
+        # tMRA is 1% of measured duration
+        # the smallest measured duration is olrt (90% resp at olrt)
+        df = self.replay(perturb, dct_label)
+        if df is not None:
+            return EpochView.from_df(df) if step_resp else df
+        self.c_env.annotate(olrt=olrt)
+        t_step = self.c_eut.mra.static.T(olrt.total_seconds())
+        i0 = self.c_env.meas_row(*meas_args)
+        perturb()
+        stop = None
+        if step_resp and self.ss_early_stop:
+            stop = self.meas_settle(i0, olrt, interval, timedelta(seconds=t_step), meas_args)
+        elif step_resp and self.adaptive_sampling:
+            self.c_env.meas_sched(
+                self.sample_offsets(olrt, interval, timedelta(seconds=t_step)), *meas_args)
+        else:
+            self.c_env.meas_window(
+                interval, timedelta(seconds=t_step), *meas_args)
+        # init and response are contiguous in the buffer, no concat needed
+        view = EpochView(self.c_env.mbuf, i0, len(self.c_env.mbuf), meas_args)
+        if stop is not None:
+            view.attrs['stop'] = stop
+        self.validator.note_meas(view)
+        return view if step_resp else view.df
+
+    def replay(self, perturb: Callable, dct_label):
+        """
+        when resuming from a checkpoint, a completed step applies its perturbation and gets its recorded
+        measurement back instead of measuring again, as long as it was recorded for dct_label (see
+        Validator.replay). the first live step after replayed ones first waits the last replayed window so the
+        eut settles where the recorded run left it.
+        :return: recorded df_meas, None if the step has to be measured
+        """
+        df = self.validator.replay(dct_label)
+        if df is not None:
+            perturb()
+            self.resync = df.index[-1] - df.index[0]
+            return df
+        if self.resync is not None:
+            self.c_env.sleep(self.resync)
+            self.resync = None
+        return None
+
+    def sample_offsets(self, olrt: timedelta, interval: timedelta, tres: timedelta):
+        """
+        sample times after the perturbation for a step response window:
+            - tres for the first olrt/4 (transition start) and within olrt/10 of olrt (t_olrt)
+            - geometric back-off (doubling from tres, capped at olrt/10) in between and up to t_ss0 at 2 * olrt
+            - uniform olrt/10 from t_ss0 to interval, so the steady state mean is not biased in time
+        :return: list of timedelta offsets
+        """
+        T, olrt_s, tres_s = interval.total_seconds(), olrt.total_seconds(), tres.total_seconds()
+        cap = max(olrt_s / 10, tres_s)
+
+        def uniform(a, b, d):
+            return list(np.arange(a, min(b, T), d))
+
+        def backoff(a, b):
+            out, t, d = [], a, tres_s
+            while t < min(b, T):
+                out.append(t)
+                t, d = t + d, min(2 * d, cap)
+            return out
+
+        offs = uniform(0, olrt_s / 4, tres_s) \
+            + backoff(olrt_s / 4, 0.9 * olrt_s) \
+            + uniform(0.9 * olrt_s, 1.1 * olrt_s, tres_s) \
+            + backoff(1.1 * olrt_s, 2 * olrt_s) \
+            + uniform(2 * olrt_s, T, cap)
+        return [timedelta(seconds=float(t)) for t in offs]
+
+    def meas_settle(self, i0, olrt: timedelta, interval: timedelta, tres: timedelta, meas_args: tuple):
+        """"""
+        '''
+        UL 1741 SB correction to 5.14.9.2 (see VV.vv_vref_validate) allows ending the measurement once the response
+        has settled. Extended here to the step responses: measure in chunks of olrt/4, and once 3 * olrt has passed
+        (t_ss0 at 2 * olrt plus at least olrt of steady state for the validators to average), stop when over the
+        trailing olrt each of P and Q has
+            - standard deviation within mra_scale * MRA
+            - mean within mra_scale * MRA / 2 of the mean over the whole steady state window (no drift)
+        '''
+        mbuf = self.c_env.mbuf
+        t0 = self.c_env.time_now()
+        chunk = olrt / 4
+        min_dur = 3 * olrt
+        bands = {c: self.mra_scale * getattr(self.c_eut.mra.static, c) for c in ('P', 'Q') if c in meas_args}
+        while interval - (self.c_env.time_now() - t0) >= tres:
+            self.c_env.meas_window(min(chunk, interval - (self.c_env.time_now() - t0)), tres, *meas_args)
+            dur = self.c_env.time_now() - t0
+            if dur < min_dur:
+                continue
+            t = mbuf.t[i0:len(mbuf)]
+            # samples after t_ss0, and the trailing olrt of those
+            iss = i0 + int(np.searchsorted(t, t[min(1, len(t) - 1)] + td_ns(2 * olrt)))
+            itail = i0 + int(np.searchsorted(t, t[-1] - td_ns(olrt)))
+            settled = True
+            for c, band in bands.items():
+                tail = mbuf.data[c][itail:len(mbuf)]
+                ss = mbuf.data[c][iss:len(mbuf)]
+                if not (tail.std() <= band and abs(tail.mean() - ss.mean()) <= band / 2):
+                    settled = False
+            if settled:
+                self.c_env.log(msg=f'steady state after {dur.total_seconds():.1f}s of {interval.total_seconds():.1f}s')
+                return 'settled'
+        return 'interval'
+
+    def cease_energize(self, pq):
+        """"""
+        '''
+        IEEE 1547.1-2018 
+        4.5 Cease to energize performance requirement
+        In the cease to energize state, the DER shall not deliver active power during steady-state or transient
+        conditions. The requirements for cease to energize shall apply to the point of DER connection (PoC).
+        For Local EPS with aggregate DER rating less than 500 kVA, the reactive power exchange in the cease to
+        energize state shall be less than 10% of nameplate DER rating and shall exclusively result from passive
+        devices. For Local EPS with aggregate DER rating 500 kVA and greater, the reactive power exchange in
+        the cease to energize state shall be less than 3% of nameplate DER rating and shall exclusively result from
+        passive devices.40
+        If requested by the Area EPS operator, the DER operator shall provide the reactive susceptance that
+        remains connected to the Area EPS in the cease to energize state.
+        Import of active power and reactive power exchange in the cease to energize state is permitted only for
+        continuation of supply to DER housekeeping and auxiliary loads.
+        Alternatively, the requirements for cease to energize may be met by disconnecting41 the local EPS, or the
+        portion of the local EPS to which the DER is connected from the Area EPS. The DER may continue to
+        deliver power to the portion of the Local EPS that is disconnected from the Area EPS.42
+        '''
+        if self.c_eut.Srated < 500e3:
+            Qlim = self.c_eut.Srated * 0.1
+        else:
+            Qlim = self.c_eut.Srated * 0.03
+        lst_PQlims = [self.c_eut.mra.static.P * self.mra_scale,
+                      Qlim + self.c_eut.mra.static.Q * self.mra_scale]
+        zipped = zip(pq, lst_PQlims)
+        return all([v < thresh for v, thresh in zipped])
+
+    def trip_step(self, dct_label, dur: timedelta, tstep_s, step0, step1, meas_args):
+        # reset eut input
+        mbuf = self.c_env.mbuf
+        self.c_env.ac_config(
+            Vac=self.c_eut.VN, freq=self.c_eut.fN, rocof=self.c_eut.rocof())
+        df_meas = self.replay(lambda: (step0(), step1()), dct_label)
+        if df_meas is None:
+            i0 = self.c_env.meas_row(*meas_args)
+            step0()
+            self.c_env.meas_window(
+                dur, timedelta(seconds=tstep_s), *meas_args)
+
+            ts = self.c_env.time_now()
+            step1()
+
+            ceased = False
+            while not self.c_env.elapsed_since(dur, ts):
+                i = self.c_env.meas_row(*meas_args)
+                if self.cease_energize(mbuf.row(i, ('P', 'Q'))):
+                    ceased = True
+                    break
+                self.c_env.sleep(timedelta(seconds=tstep_s))
+            self.c_env.meas_row(*meas_args)
+
+            df_meas = mbuf.df(i0, len(mbuf), meas_args)
+            # the cease check reads samples as they come, keep its outcome for replay
+            df_meas.attrs['ceased'] = ceased
+            self.validator.note_meas(df_meas)
+        ceased = df_meas.attrs['ceased']
+        self.validator.record_epoch(
+            df_meas=df_meas,
+            dct_crits={},
+            start=df_meas.index[0],
+            end=df_meas.index[-1],
+            fields=dct_label,
+            checks={'valid': ceased},
+            passed=ceased
+        )
+
+    def default_cfg(self):
+        self.set_esfast()
+        self.c_eut.set_cpf(Ena=True, PF=1.0, Exct='inj')
+        self.c_eut.set_crp(Ena=False, pu=0.0)
+        self.c_eut.set_wv(Ena=False)
+        self.c_eut.set_vv(Ena=False, autoVrefEna=False)
+        self.c_eut.set_vv(Ena=True)
+        self.c_eut.set_vw(Ena=False)
+        self.c_eut.set_lap(Ena=False, pu=1)
+        self.c_eut.set_sap(spu=2.0)
+
+    def conn_to_grid(self):
+        # vdc to nom
+        # vgrid to std
+        pass
+
+    def trip_rst(self):
+        pass
+
+    def snapshot(self):
+        """
+        :return: (env, eut) state, None if the eut can't be restored
+        """
+        snap = self.c_eut.snapshot()
+        if snap is None:
+            return None
+        return self.c_env.snapshot(), snap
+
+    def restore(self, snap):
+        self.c_env.restore(snap[0])
+        self.c_eut.restore(snap[1])
+
+    def new_validator(self, proc):
+        """
+        start a procedure: fresh validator that clears c_env.mbuf after each epoch, and no settled states carried
+        over from earlier procedures
+        """
+        self.settled = {}
+        opts = dict(self.validator_opts)
+        report = opts.pop('report', {})
+        validator = viz.Validator(proc, MeasStore(proc, **opts.pop('store', {})),
+                                  None if report is None else viz.Report(**report), **opts)
+        validator.mbuf = self.c_env.mbuf
+        return validator
+
+    def trip_restart(self, snap):
+        # back to the pre-trip state if trip_fork and the eut can be restored, otherwise re-energize it
+        if self.trip_fork and snap is not None:
+            self.restore(snap)
+        else:
+            self.trip_rst()
+
+    def settle(self, td: timedelta):
+        """
+        wait td for steady state. the settled state is saved under the eut's settle key (configuration and inputs,
+        including the ac source setpoint), and a later settle from the same key restores it instead of waiting again
+        """
+        if self.validator.replay_q:
+            # replaying a checkpoint, settling is owed by replay before the next live step
+            return
+        key = self.c_eut.settle_key()
+        if key is None:
+            self.c_env.sleep(td)
+            return
+        snap = self.settled.get(key)
+        if snap is not None:
+            self.restore(snap)
+            return
+        self.c_env.sleep(td)
+        snap = self.snapshot()
+        if snap is not None:
+            self.settled[key] = snap
@@ -0,0 +1,63 @@
+"""
+vectorized criteria: every function takes scalars or arrays of x/t and broadcasts
+"""
+from typing import Callable
+import numpy as np
+
+LN_0P1 = np.log(0.1)
+
+
+def expapp(olrt, t, y0, y1):
+    '''
+    :param olrt: response time in seconds
+    :param t: time argument
+    :param y0: initial value
+    :param y1: final value
+    :return: y(t), where y is exp approach from y0 to y1, reaching 90% at olrt
+    '''
+    return (np.asarray(y0) - y1) * np.exp(LN_0P1 * np.asarray(t) / olrt) + y1
+
+
+def range_4p2(y_of_x: Callable, x, xMRA, yMRA, scale=1.5):
+    '''
+    IEEE 1547.1-2020 4.2
+    y_of_x must accept arrays, i.e. np.interp based curves
+    :return: y_min, y_max
+    '''
+    x = np.asarray(x)
+    # constant curves (lambda x: y) broadcast to the shape of x
+    y_lo, y_hi, _ = np.broadcast_arrays(y_of_x(x - scale * xMRA), y_of_x(x + scale * xMRA), x)
+    return (np.minimum(y_lo, y_hi) - scale * yMRA)[()], (np.maximum(y_lo, y_hi) + scale * yMRA)[()]
+
+
+def envelope(y_of_x: Callable, x, xMRA, yMRA, scale=1.5):
+    """
+    :return: y_min, y_target, y_max at every x
+    """
+    y_min, y_max = range_4p2(y_of_x, x, xMRA, yMRA, scale)
+    return y_min, np.broadcast_to(y_of_x(np.asarray(x)), np.shape(y_min))[()], y_max
+
+
+def expapp_envelope(t, olrt, y0, y1, tMRA, yMRA, scale=1.5):
+    """
+    band around the exp approach from y0 to y1 at every t, t in seconds from the step
+    :return: y_min, y_target, y_max
+    """
+    def y_of_t(t): return expapp(olrt, t, y0, y1)
+    return envelope(y_of_t, t, tMRA, yMRA, scale)
+
+
+def first_violation(y, y_min, y_max):
+    """
+    :return: position of the first y outside [y_min, y_max], None if there is none
+    """
+    out = (np.asarray(y) < y_min) | (np.asarray(y) > y_max)
+    return int(np.argmax(out)) if out.any() else None
+
+
+def margin(y, y_min=-np.inf, y_max=np.inf):
+    """
+    :return: distance from y to the nearest bound, negative outside [y_min, y_max]
+    """
+    y = np.asarray(y)
+    return np.minimum(y - y_min, y_max - y)[()]
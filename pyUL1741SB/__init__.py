@@ -1,22 +1,55 @@
-from pyUL1741SB.eut import Eut
-from pyUL1741SB.env import Env
-
-from pyUL1741SB.IEEE1547.VoltReg.cpf import CPF
-from pyUL1741SB.IEEE1547.VoltReg.crp import CRP
-from pyUL1741SB.IEEE1547.VoltReg.vv import VV
-from pyUL1741SB.IEEE1547.VoltReg.vw import VW
-from pyUL1741SB.IEEE1547.VoltReg.wv import WV
-from pyUL1741SB.IEEE1547.FreqSupp import FreqSupp
-from pyUL1741SB.IEEE1547.LimitAP import LAP
-from pyUL1741SB.IEEE1547.RespPri import RespPri
-from pyUL1741SB.IEEE1547.EnterService import ES
-from pyUL1741SB.IEEE1547.VoltDistResp import VoltDist
-from pyUL1741SB.IEEE1547.FreqDistResp import FreqDist
-from pyUL1741SB.IEEE1547 import IEEE1547
-
-from pyUL1741SB.eut import VoltShallTripTable
-from pyUL1741SB.eut import FreqShallTripTable
-
-class UL1741SB(CPF, CRP, VV, VW, WV, FreqSupp, RespPri, LAP, ES, VoltDist, FreqDist, IEEE1547):
-    pass
+"""
+names are loaded on first access (PEP 562): importing the package costs nothing, `from pyUL1741SB import Eut` loads
+the Eut module only, and the procedure mixins load with the first of them used
+"""
+import importlib
 
+'''
+public name -> module defining it
+'''
+LAZY = {
+    'Eut': 'pyUL1741SB.eut',
+    'VoltShallTripTable': 'pyUL1741SB.eut',
+    'FreqShallTripTable': 'pyUL1741SB.eut',
+    'Env': 'pyUL1741SB.env',
+    'CPF': 'pyUL1741SB.IEEE1547.VoltReg.cpf',
+    'CRP': 'pyUL1741SB.IEEE1547.VoltReg.crp',
+    'VV': 'pyUL1741SB.IEEE1547.VoltReg.vv',
+    'VW': 'pyUL1741SB.IEEE1547.VoltReg.vw',
+    'WV': 'pyUL1741SB.IEEE1547.VoltReg.wv',
+    'FreqSupp': 'pyUL1741SB.IEEE1547.FreqSupp',
+    'LAP': 'pyUL1741SB.IEEE1547.LimitAP',
+    'RespPri': 'pyUL1741SB.IEEE1547.RespPri',
+    'ES': 'pyUL1741SB.IEEE1547.EnterService',
+    'VoltDist': 'pyUL1741SB.IEEE1547.VoltDistResp',
+    'FreqDist': 'pyUL1741SB.IEEE1547.FreqDistResp',
+    'IEEE1547': 'pyUL1741SB.IEEE1547.base',
+    'UL1741SB': 'pyUL1741SB.ul1741sb',
+}
+
+__all__ = list(LAZY)
+
+
+def _load(name):
+    value = getattr(importlib.import_module(LAZY[name]), name)
+    globals()[name] = value  # later lookups skip __getattr__
+    return value
+
+
+def __getattr__(name):
+    if name not in LAZY:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return _load(name)
+
+
+'''
+the import system binds a subpackage to its parent on first import only. the IEEE1547 subpackage is light, so it is
+imported here and its binding dropped: IEEE1547 then resolves through __getattr__ to the class, whatever is imported
+later. the subpackage's modules are imported with from pyUL1741SB.IEEE1547 import crit, not import ... as
+'''
+importlib.import_module('pyUL1741SB.IEEE1547')
+del globals()['IEEE1547']
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY))
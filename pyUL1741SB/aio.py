@@ -0,0 +1,271 @@
+"""
+asyncio interface for benches whose instruments can be driven concurrently
+
+procedures stay synchronous (see run_proc): configuration calls that return nothing (Eut set_*, dc_config, Env
+ac_config) are started without waiting, so the grid simulator and the EUT are configured at the same time. any call
+that measures, lets time pass or returns a value first waits for every call issued before it, errors of a started
+call surface there. calls to one instrument run in order, measurements never overlap.
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta, datetime
+import pandas as pd
+from pyUL1741SB.eut import Eut
+from pyUL1741SB.env import Env
+
+
+class AsyncEnv:
+    '''
+    awaitable counterpart of Env.
+    the defaults run a wrapped synchronous Env in a worker thread so existing drivers keep working;
+    bench drivers override the coroutines with native async instrument I/O.
+    '''
+    def __init__(self, env: Env = None):
+        self.env = env
+        # a synchronous driver is not assumed to be thread safe, calls into it are serialized
+        self._pool = ThreadPoolExecutor(max_workers=1)
+
+    async def _call(self, name, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, lambda: getattr(self.env, name)(*args, **kwargs))
+
+    def time_now(self) -> datetime:
+        return self.env.time_now()
+
+    def elapsed_since(self, interval: timedelta, start: datetime) -> bool:
+        return self.time_now() - start >= interval
+
+    async def sleep(self, td: timedelta):
+        await self._call('sleep', td)
+
+    async def meas_single(self, *args) -> pd.DataFrame:
+        return await self._call('meas_single', *args)
+
+    async def meas_for(self, dur: timedelta, tres: timedelta, *args) -> pd.DataFrame:
+        return await self._call('meas_for', dur, tres, *args)
+
+    async def ac_config(self, **kwargs):
+        await self._call('ac_config', **kwargs)
+
+    async def ac_config_asym(self, **kwargs):
+        await self._call('ac_config_asym', **kwargs)
+
+    def log(self, **kwargs):
+        self.env.log(**kwargs)
+
+    def close(self):
+        self._pool.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+class AsyncEut:
+    '''
+    awaitable counterpart of the Eut control interface.
+    nameplate attributes (VN, Prated, mra, olrt, ...) are read from the wrapped Eut.
+    '''
+    def __init__(self, eut: Eut):
+        self.eut = eut
+        self._pool = ThreadPoolExecutor(max_workers=1)
+
+    def __getattr__(self, name):
+        return getattr(self.eut, name)
+
+    async def _call(self, name, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, lambda: getattr(self.eut, name)(*args, **kwargs))
+
+    async def dc_config(self, **kwargs):
+        await self._call('dc_config', **kwargs)
+
+    async def set_cpf(self, **kwargs):
+        await self._call('set_cpf', **kwargs)
+
+    async def set_lap(self, Ena: bool, pu):
+        await self._call('set_lap', Ena, pu)
+
+    async def set_aap(self, spu):
+        await self._call('set_aap', spu)
+
+    async def set_sap(self, spu):
+        await self._call('set_sap', spu)
+
+    async def set_crp(self, **kwargs):
+        await self._call('set_crp', **kwargs)
+
+    async def set_vv(self, Ena: bool, crv=None, autoVrefEna=None, vrefTr_s=None):
+        await self._call('set_vv', Ena, crv=crv, autoVrefEna=autoVrefEna, vrefTr_s=vrefTr_s)
+
+    async def set_wv(self, Ena: bool, crv=None):
+        await self._call('set_wv', Ena, crv=crv)
+
+    async def set_vw(self, Ena: bool, crv=None):
+        await self._call('set_vw', Ena, crv=crv)
+
+    async def set_vt(self, **kwargs):
+        await self._call('set_vt', **kwargs)
+
+    async def set_ft(self, **kwargs):
+        await self._call('set_ft', **kwargs)
+
+    async def has_tripped(self):
+        return await self._call('has_tripped')
+
+    async def set_fw(self, Ena: bool, crv=None):
+        await self._call('set_fw', Ena, crv=crv)
+
+    async def set_es(self, **kwargs):
+        await self._call('set_es', **kwargs)
+
+    def close(self):
+        self._pool.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+
+def posted(name):
+    # configuration calls, started without waiting for them
+    return name.startswith('set_') or name in ('dc_config', 'ac_config', 'ac_config_asym')
+
+
+class Bridge:
+    '''
+    runs coroutines on an event loop from the procedure thread.
+    every call is bounded by timeout; cancel() fails the current and all later calls.
+    post() starts a call and returns at once, run() and drain() wait for every posted call first.
+    '''
+    def __init__(self, loop: asyncio.AbstractEventLoop, timeout: float = None):
+        self.loop = loop
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self.pending = set()
+        self.posted = []
+
+    def _submit(self, coro):
+        if self.cancelled.is_set():
+            coro.close()
+            raise asyncio.CancelledError('procedure cancelled')
+        fut = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.pending.add(fut)
+        return fut
+
+    def _wait(self, fut):
+        try:
+            return fut.result(self.timeout)
+        except TimeoutError:
+            fut.cancel()
+            raise
+        finally:
+            self.pending.discard(fut)
+
+    def post(self, coro):
+        self.posted.append(self._submit(coro))
+
+    def drain(self):
+        posted, self.posted = self.posted, []
+        for fut in posted:
+            self._wait(fut)
+
+    def run(self, coro):
+        self.drain()
+        return self._wait(self._submit(coro))
+
+    def cancel(self):
+        self.cancelled.set()
+        for fut in list(self.pending):
+            fut.cancel()
+
+
+class SyncEnv(Env):
+    '''
+    Env facade over an AsyncEnv, lets the existing procedures drive an async bench from a worker thread
+    '''
+    def __init__(self, aenv: AsyncEnv, bridge: Bridge):
+        super().__init__()
+        self.aenv = aenv
+        self.bridge = bridge
+
+    def __getattr__(self, name):
+        attr = getattr(self.aenv, name)
+        if asyncio.iscoroutinefunction(attr):
+            call = self.bridge.post if posted(name) else self.bridge.run
+            return lambda *args, **kwargs: call(attr(*args, **kwargs))
+        return attr
+
+    def elapsed_since(self, interval: timedelta, start: datetime) -> bool:
+        return self.aenv.elapsed_since(interval, start)
+
+    def time_now(self):
+        return self.aenv.time_now()
+
+    def sleep(self, td: timedelta):
+        self.bridge.run(self.aenv.sleep(td))
+
+    def meas_row(self, *args) -> int:
+        df = self.bridge.run(self.aenv.meas_single(*args))
+        return self.mbuf.extend_df(df)[0]
+
+    def meas_for(self, dur: timedelta, tres: timedelta, *args) -> pd.DataFrame:
+        df = self.bridge.run(self.aenv.meas_for(dur, tres, *args))
+        i0, i1 = self.mbuf.extend_df(df)
+        return self.mbuf.df(i0, i1, args)
+
+    def ac_config(self, **kwargs):
+        self.bridge.post(self.aenv.ac_config(**kwargs))
+
+    def log(self, **kwargs):
+        self.aenv.log(**kwargs)
+
+
+class SyncEut:
+    '''
+    Eut facade over an AsyncEut, coroutine methods block the procedure thread until done
+    '''
+    def __init__(self, aeut: AsyncEut, bridge: Bridge):
+        self.aeut = aeut
+        self.bridge = bridge
+
+    def __getattr__(self, name):
+        attr = getattr(self.aeut, name)
+        if asyncio.iscoroutinefunction(attr):
+            call = self.bridge.post if posted(name) else self.bridge.run
+            return lambda *args, **kwargs: call(attr(*args, **kwargs))
+        return attr
+
+
+async def run_proc(std_cls, aenv: AsyncEnv, aeut: AsyncEut, proc: str, *args, timeout: float = None):
+    """
+    run a synchronous procedure (e.g. 'cpf', 'vv_vref', 'oft') against an async bench.
+    the procedure runs in a worker thread, its Env/Eut calls are awaited on the running loop,
+    so other tasks (logging, monitoring, other benches) keep going meanwhile.
+    cancelling the awaiting task stops the procedure at its next Env/Eut call.
+    :param timeout: seconds allowed for each Env/Eut call
+    :return: the std instance, holding the validator of the run
+    """
+    loop = asyncio.get_running_loop()
+    bridge = Bridge(loop, timeout)
+    std = std_cls(SyncEnv(aenv, bridge), SyncEut(aeut, bridge))
+
+    def work():
+        getattr(std, proc)(*args)
+        # configuration the procedure ended with
+        bridge.drain()
+
+    fut = loop.run_in_executor(None, work)
+    try:
+        await asyncio.shield(fut)
+    except asyncio.CancelledError:
+        bridge.cancel()
+        # let the worker unwind through the procedure's finally blocks
+        await asyncio.gather(fut, return_exceptions=True)
+        raise
+    return std
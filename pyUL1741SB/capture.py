@@ -0,0 +1,286 @@
+"""
+columnar capture of recorded measurements: an Arrow IPC file per procedure, one record batch per epoch
+
+batch k holds the samples of epoch k of the Validator (see EpochTable): ts (int64 ns since 1970, timezone in the schema
+metadata), P Q V F (float64 or float32 as configured, null where not measured) and the per sample envelopes
+{trace}_min/_targ/_max (float32, null where the validator supplied none). the batch's custom metadata 'segs' lists the
+measurements the epoch was recorded from as [rows, attrs] pairs, so a replay hands them back one by one
+(see pyUL1741SB.replay).
+captures are memory mapped on reading: opening is instant and an epoch or a time slice only touches its own pages.
+
+pyarrow is optional, it is imported when a capture is first written or read
+"""
+import os
+import json
+import tempfile
+import weakref
+import numpy as np
+import pandas as pd
+
+TRACES = ('P', 'Q', 'V', 'F')
+ENV = ('min', 'targ', 'max')
+
+
+class CaptureExhausted(EOFError):
+    # an offline replay asked for a step past the end of its capture
+    pass
+
+
+def _jsonable(v):
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def _pa():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError('captures need pyarrow: pip install pyarrow') from e
+    return pa
+
+
+def schema(dtype=np.float64, tz=None):
+    pa = _pa()
+    t = pa.from_numpy_dtype(np.dtype(dtype))
+    return pa.schema(
+        [pa.field('ts', pa.int64())] + [pa.field(c, t) for c in TRACES] +
+        [pa.field(f'{c}_{e}', pa.float32()) for c in TRACES for e in ENV],
+        metadata={'tz': '' if tz is None else str(tz)})
+
+
+class CaptureWriter:
+    def __init__(self, path, dtype=np.float64):
+        pa = _pa()
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.sink = pa.OSFile(path, 'wb')
+        self.writer = None  # opened with the first epoch, which fixes the timezone
+        self.schema = None
+        self.n = 0
+
+    def write(self, df_meas: pd.DataFrame, envs: dict = None, segs=None):
+        """
+        append one epoch
+        :param envs: {trace: (3, n) array of min targ max}, see MeasStore.envs
+        :param segs: [(rows, attrs)] of the measurements df_meas was recorded from, df_meas as one by default
+        """
+        pa = _pa()
+        if self.writer is None:
+            self.schema = schema(self.dtype, df_meas.index.tz)
+            self.writer = pa.ipc.new_file(self.sink, self.schema)
+        sch = self.schema
+        n = len(df_meas)
+        envs = envs or {}
+        arrays = [pa.array(df_meas.index.as_unit('ns').asi8)]
+        for c in TRACES:
+            arrays.append(pa.array(df_meas[c].to_numpy(self.dtype)) if c in df_meas else pa.nulls(n, sch.field(c).type))
+        for c in TRACES:
+            for j in range(len(ENV)):
+                arrays.append(pa.array(envs[c][j]) if c in envs else pa.nulls(n, pa.float32()))
+        segs = [(len(df_meas), df_meas.attrs)] if segs is None else segs
+        meta = json.dumps([[n, {k: _jsonable(v) for k, v in attrs.items()}] for n, attrs in segs])
+        self.writer.write_batch(pa.record_batch(arrays, schema=sch), custom_metadata={'segs': meta})
+        self.n += 1
+
+    def close(self):
+        if self.writer is None:
+            self.writer = _pa().ipc.new_file(self.sink, schema(self.dtype))
+        self.writer.close()
+        self.sink.close()
+
+
+class Capture:
+    def __init__(self, path):
+        pa = _pa()
+        self.path = path
+        self.source = pa.memory_map(path, 'r')
+        self.reader = pa.ipc.open_file(self.source)
+        self.tz = self.reader.schema.metadata.get(b'tz', b'').decode() or None
+
+    def __len__(self):
+        return self.reader.num_record_batches
+
+    def close(self):
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def index(self, t_ns) -> pd.DatetimeIndex:
+        t = pd.to_datetime(t_ns, unit='ns', utc=self.tz is not None)
+        return pd.DatetimeIndex(t if self.tz is None else t.tz_convert(self.tz))
+
+    def ts(self, k) -> np.ndarray:
+        # zero copy view into the mapped file
+        return self.reader.get_batch(k).column('ts').to_numpy()
+
+    def span(self, k):
+        """
+        :return: (first, last) sample time of epoch k in ns
+        """
+        t = self.ts(k)
+        return (t[0], t[-1]) if len(t) else (None, None)
+
+    def _df(self, batch, cols=None) -> pd.DataFrame:
+        cols = TRACES if cols is None else cols
+        return pd.DataFrame({c: batch.column(c).to_numpy(zero_copy_only=False) for c in cols},
+                            index=self.index(batch.column('ts').to_numpy()))
+
+    def epoch(self, k, cols=None) -> pd.DataFrame:
+        """
+        :param cols: columns to read, P Q V F by default, i.e. ('P', 'P_min', 'P_max')
+        """
+        return self._df(self.reader.get_batch(k), cols)
+
+    def envs(self, k) -> dict:
+        """
+        :return: {trace: float32 array (3, n) of min targ max} of epoch k, as MeasStore.envs
+        """
+        batch = self.reader.get_batch(k)
+        return {c: np.array([batch.column(f'{c}_{e}').to_numpy(zero_copy_only=False) for e in ENV])
+                for c in TRACES if batch.column(f'{c}_min').null_count < len(batch)}
+
+    def segments(self):
+        """
+        :return: every measurement of every epoch in recording order, as DataFrames with their attrs and the traces
+            that were measured
+        """
+        out = []
+        for k in range(len(self)):
+            batch, meta = self.reader.get_batch_with_custom_metadata(k)
+            cols = [c for c in TRACES if batch.column(c).null_count < len(batch)]
+            df = self._df(batch, cols)
+            i = 0
+            for n, attrs in json.loads(meta[b'segs']) if meta is not None else [[len(df), {}]]:
+                seg = df.iloc[i:i + n].copy()
+                seg.attrs = attrs
+                out.append(seg)
+                i += n
+        return out
+
+    def slice(self, t0, t1, cols=None) -> pd.DataFrame:
+        """
+        samples in [t0, t1) from the epochs overlapping it, only those epochs are read
+        """
+        t0, t1 = (pd.Timestamp(t).as_unit('ns').value for t in (t0, t1))
+        lst = []
+        for k in range(len(self)):
+            t = self.ts(k)
+            if not len(t) or t[-1] < t0 or t[0] >= t1:
+                continue
+            i0, i1 = np.searchsorted(t, [t0, t1])
+            lst.append(self._df(self.reader.get_batch(k).slice(i0, i1 - i0), cols))
+        if not lst:
+            cols = TRACES if cols is None else cols
+            return pd.DataFrame({c: np.empty(0) for c in cols}, index=self.index(np.empty(0, dtype=np.int64)))
+        return pd.concat(lst)
+
+
+def remove(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class MeasStore:
+    '''
+    measurements and per sample envelopes of the epochs of one procedure run, held by its Validator.
+    capture: directory where every epoch is written to {proc}.arrow at capture_dtype, see Capture. closed by close.
+    mem_budget: bytes of measurements and envelopes kept in memory. past it the oldest epochs spill to a capture file
+    in spill_dir (the temp dir by default) owned by this store, and their entries in meas and envs become None.
+    iter_meas reads them back one at a time
+    '''
+    def __init__(self, proc, capture=None, capture_dtype=np.float64, mem_budget=None, spill_dir=None):
+        self.proc = proc
+        self.capture = None
+        self.capture_path = None
+        if capture is not None:
+            self.capture_path = f'{capture}{proc}.arrow'
+            self.capture = CaptureWriter(self.capture_path, capture_dtype)
+        self.mem_budget = mem_budget
+        self.spill_dir = spill_dir
+        if mem_budget is not None:
+            # spill files are captures, without pyarrow the run fails here instead of at its first spill
+            _pa()
+        self.meas = []  # df ts-index P Q V F per epoch
+        # per epoch, aligned with meas: {trace: float32 array (3, n) of min targ max at every sample}
+        self.envs = []
+        self.mem = 0
+        self.sizes = []  # bytes per epoch in memory
+        self.n_rows = []  # samples per epoch
+        self.env_keys = []  # traces with an envelope per epoch
+        self.spills = []  # (path, first epoch) of closed spill files
+        self.spill = None  # CaptureWriter of the open spill file
+        self.spill_k0 = 0  # first epoch of the open spill file
+        self.n_spilled = 0  # epochs [0, n_spilled) are on disk
+
+    def __len__(self):
+        return len(self.meas)
+
+    def append(self, df_meas: pd.DataFrame, envs: dict, segs=None):
+        """
+        :param df_meas: owned by the store from here on
+        :param segs: see CaptureWriter.write
+        """
+        self.meas.append(df_meas)
+        self.envs.append(envs)
+        self.n_rows.append(len(df_meas))
+        self.env_keys.append(tuple(envs))
+        size = int(df_meas.memory_usage(index=True).sum()) + sum(env.nbytes for env in envs.values())
+        self.sizes.append(size)
+        self.mem += size
+        if self.mem_budget is not None and self.mem > self.mem_budget:
+            self._spill()
+        if self.capture is not None:
+            self.capture.write(df_meas, envs, segs)
+
+    def _spill(self):
+        # oldest first, so each spill file holds consecutive epochs
+        while self.mem > self.mem_budget and self.n_spilled < len(self.meas):
+            k = self.n_spilled
+            if self.spill is None:
+                fd, path = tempfile.mkstemp(suffix=f'.{self.proc}.arrow', dir=self.spill_dir)
+                os.close(fd)
+                weakref.finalize(self, remove, path)
+                self.spill, self.spill_k0 = CaptureWriter(path, self.meas[k].dtypes.get('P', np.float64)), k
+            self.spill.write(self.meas[k], self.envs[k])
+            self.meas[k], self.envs[k] = None, None
+            self.mem -= self.sizes[k]
+            self.sizes[k] = 0
+            self.n_spilled += 1
+
+    def _close_spill(self):
+        # a spill file is readable once closed, later spills open a new one
+        if self.spill is not None:
+            self.spill.close()
+            self.spills.append((self.spill.path, self.spill_k0))
+            self.spill = None
+
+    def iter_meas(self):
+        """
+        (df_meas, envs) of every epoch in order, spilled ones read back from disk one at a time
+        """
+        self._close_spill()
+        k = 0
+        for path, k0 in self.spills:
+            with Capture(path) as cap:
+                for j in range(len(cap)):
+                    yield cap.epoch(j), cap.envs(j)
+                k = k0 + len(cap)
+        for df_meas, envs in zip(self.meas[k:], self.envs[k:]):
+            yield df_meas, envs
+
+    def close(self):
+        if self.capture is not None:
+            self.capture.close()
+            self.capture = None
+
+    def __getstate__(self):
+        # a pickled store takes the epochs in memory and the paths of the spill files, which it reads itself.
+        # the files stay owned by this store, removed when it is collected
+        self._close_spill()
+        state = self.__dict__.copy()
+        state['spill'] = None
+        return state
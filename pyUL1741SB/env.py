@@ -2,6 +2,7 @@ from datetime import timedelta, datetime
 import pandas as pd
 import numpy as np
 import random
+from pyUL1741SB.meas import MeasBuffer, td_ns
 Prated = 5e3
 
 
@@ -9,6 +10,8 @@ class Env:  # step voltage, power, sleep, etc.
     def __init__(self):
         self.results = {}
         self.time = datetime.now()
+        # every sample taken through meas_row/meas_single/meas_window lands here
+        self.mbuf = MeasBuffer()
 
     def elapsed_since(self, interval: timedelta, start: datetime) -> bool:
         # return datetime.now() - start >= interval - what this should do during actual validation
@@ -21,44 +24,90 @@ class Env:  # step voltage, power, sleep, etc.
         # add a little to simulate extra time taken to run code
         self.time += td + timedelta(seconds=0.001)
 
-    def meas_single(self, *args) -> pd.DataFrame:
+    def meas_row(self, *args) -> int:
+        """
+        measure once into self.mbuf
+        :return: row position in self.mbuf
+        """
+        if type(self).meas_single is not Env.meas_single:
+            # written to the DataFrame interface, its sample is copied in
+            return self.mbuf.extend_df(self.meas_single(*args))[0]
         self.time += timedelta(seconds=random.random() * 0.001)
 
         data = {}
         for arg in args:
             data[arg] = random.random()
+        if 'P' in data:
+            data['P'] = data['P'] * Prated
+        return self.mbuf.append(self.time, **data)
+
+    def meas_single(self, *args) -> pd.DataFrame:
+        i = self.meas_row(*args)
+        return self.mbuf.df(i, i + 1, args)
+
+    def meas_into(self, buf: MeasBuffer, n: int, tres: timedelta, *args):
+        """
+        take n samples tres apart into buf
+        :return: (start, end) row positions in buf
+        """
+        # Generate timestamps starting from current time
+        t_ns = buf.ns(self.time) + np.arange(n, dtype=np.int64) * td_ns(tres)
+        self.time += n * tres
 
-        # Create DataFrame with time as the index
-        df = pd.DataFrame(data, index=[self.time])
-        if 'P' in df.columns:
-            # Assuming Prated is an instance variable
-            df['P'] = df['P'] * Prated
-        return df
+        # Generate random data for each specified column
+        data = {}
+        for column_name in args:
+            # Generate random data (you can modify the distribution as needed)
+            data[column_name] = np.random.randn(n)
+        if 'P' in data:
+            data['P'] = data['P'] * Prated
+        return buf.extend(t_ns, **data)
 
     def meas_for(self, dur: timedelta, tres: timedelta, *args) -> pd.DataFrame:
-        self.time += dur
         # add a little to simulate extra time taken to run code
         self.time += timedelta(seconds=random.random() * 0.001)
         # Calculate number of periods based on duration and time resolution
         num_periods = int(dur.total_seconds() / tres.total_seconds())
+        i0, i1 = self.meas_into(self.mbuf, num_periods, tres, *args)
+        return self.mbuf.df(i0, i1, args)
 
-        # Generate timestamp index starting from current time
-        index = pd.date_range(
-            start=self.time,
-            periods=num_periods,
-            freq=pd.Timedelta(tres)
-        )
+    def meas_window(self, dur: timedelta, tres: timedelta, *args):
+        """
+        meas_for into self.mbuf, what the procedures measure with. the window of an Env written to the DataFrame
+        interface (meas_for returns it, self.mbuf doesn't grow) is copied in
+        :return: (start, end) row positions in self.mbuf
+        """
+        i0 = len(self.mbuf)
+        df = self.meas_for(dur, tres, *args)
+        if len(self.mbuf) == i0:
+            self.mbuf.extend_df(df)
+        return i0, len(self.mbuf)
 
-        # Create DataFrame with random data for each specified column
-        data = {}
-        for column_name in args:
-            # Generate random data (you can modify the distribution as needed)
-            data[column_name] = np.random.randn(num_periods)
+    def meas_sched(self, offsets, *args) -> pd.DataFrame:
+        """
+        sample at the given timedelta offsets from now, for non-uniform sampling
+        """
+        t0 = self.time_now()
+        i0 = len(self.mbuf)
+        for off in offsets:
+            wait = t0 + off - self.time_now()
+            if wait > timedelta(0):
+                self.sleep(wait)
+            self.meas_row(*args)
+        return self.mbuf.df(i0, len(self.mbuf), args)
+
+    def snapshot(self):
+        """
+        capture source settings for restore(). the clock is never rewound so recorded time stays monotonic
+        """
+        return {}
 
-        df = pd.DataFrame(data, index=index)
-        if 'P' in df.columns:
-            df['P'] = df['P'] * Prated
-        return df
+    def restore(self, snap):
+        pass
+
+    def annotate(self, **kwargs):
+        # step metadata from the procedures (i.e. olrt), for tracing Envs
+        pass
 
     def ac_config(self, **kwargs):
         pass
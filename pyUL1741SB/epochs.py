@@ -0,0 +1,129 @@
+"""
+epochs of a Validator as typed columns
+
+every epoch is a row: its step identity (the fields of its label, the common ones under canonical names), outcome,
+every criterion's pass/fail and margin, and start/end rows in the run's measurements. labels are only joined when
+asked for, i.e. to draw or to compile a plan.
+"""
+import numpy as np
+import pandas as pd
+
+'''
+label fields stored under a canonical column so procedures can be compared, i.e. a pass/fail matrix of step by curve
+'''
+ALIASES = {
+    'crv': 'curve',
+    'pwr': 'power',
+    'pwr_pu': 'power',
+    'Step': 'step',
+    'iter': 'iteration',
+}
+
+BASE = ('proc', 'start', 'end', 'i0', 'i1', 'passed', 'stop', 'violation')
+
+
+class EpochTable:
+    '''
+    cols: {column: list}, one entry per epoch
+        proc, start, end (ts), i0, i1 (rows of the epoch in the measurements of all epochs in order, as batches of
+        a capture are read; -1 for epochs appended without measurements),
+        passed, stop (why the window ended or None), violation (ts of the first sample outside its envelope or None),
+        one column per label field, ok_{check} (bool) and margin_{check} (distance to the nearest bound, NaN if the
+        check has none) per check
+    '''
+    def __init__(self, proc):
+        self.proc = proc
+        self.cols = {c: [] for c in BASE + ('layout',)}
+        # (field name as labelled, column) pairs and check names of an epoch, shared by epochs of the same kind
+        self.layouts = []
+        self._layout = {}
+
+    def __len__(self):
+        return len(self.cols['layout'])
+
+    def _col(self, c, fill):
+        if c not in self.cols:
+            self.cols[c] = [fill] * len(self)
+        return self.cols[c]
+
+    def append(self, fields: dict, checks: dict, **kwargs):
+        """
+        :param fields: step identity, i.e. {'proc': 'cpf', 'Vin': '1.00', 'PF': '0.90inj', 'Step': 'g'}
+        :param checks: {name: passed or (passed, margin)}
+        :param kwargs: start, end, passed, stop, violation, i0, i1
+        """
+        names = tuple((k, ALIASES[k] if k in ALIASES and ALIASES[k] not in fields else k) for k in fields)
+        key = (names, tuple(checks))
+        if key not in self._layout:
+            self._layout[key] = len(self.layouts)
+            self.layouts.append(key)
+        row = {'proc': fields.get('proc', self.proc), 'i0': -1, 'i1': -1, 'stop': None, 'violation': None, **kwargs,
+               'layout': self._layout[key]}
+        for k, c in names:
+            row[c] = fields[k]
+        for name, check in checks.items():
+            ok, m = check if isinstance(check, tuple) else (check, np.nan)
+            row[f'ok_{name}'] = bool(ok)
+            row[f'margin_{name}'] = float(m)
+        for c, v in row.items():
+            self._col(c, np.nan if c.startswith('margin_') else None)
+        for c, lst in self.cols.items():
+            lst.append(row.get(c, np.nan if c.startswith('margin_') else None))
+
+    def fields(self, k) -> dict:
+        names, _ = self.layouts[self.cols['layout'][k]]
+        return {name: self.cols[c][k] for name, c in names}
+
+    def checks(self, k) -> dict:
+        _, checks = self.layouts[self.cols['layout'][k]]
+        return {name: (self.cols[f'ok_{name}'][k], self.cols[f'margin_{name}'][k]) for name in checks}
+
+    def label(self, k) -> str:
+        _, checks = self.layouts[self.cols['layout'][k]]
+        stop = self.cols['stop'][k]
+        return ''.join(f"{name}: {v}; " for name, v in {
+            **self.fields(k), **{name: self.cols[f'ok_{name}'][k] for name in checks},
+            **({} if stop is None else {'stop': stop})}.items())
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(len(self))[k]]
+        k = range(len(self))[k]
+        return {
+            **{c: self.cols[c][k] for c in BASE},
+            'label': self.label(k),
+            'fields': self.fields(k),
+            'checks': self.checks(k),
+        }
+
+    def __iter__(self):
+        return (self[k] for k in range(len(self)))
+
+    def df(self, labels=False) -> pd.DataFrame:
+        df = pd.DataFrame({c: v for c, v in self.cols.items() if c != 'layout'})
+        if labels:
+            df.insert(BASE.index('end') + 1, 'label', [self.label(k) for k in range(len(self))])
+        return df
+
+    def matrix(self, index, columns, check=None) -> pd.DataFrame:
+        """
+        pass/fail of every index by columns pair, False if any epoch of the pair failed
+        :param check: name of a single check, overall pass by default
+        """
+        return self.df().pivot_table(index=index, columns=columns, values='passed' if check is None else f'ok_{check}',
+                                     aggfunc='all')
+
+    def worst(self, check=None, n=5) -> pd.DataFrame:
+        """
+        :return: n epochs closest to (or furthest past) a bound, with their smallest margin as 'margin'
+        """
+        df = self.df()
+        ms = [f'margin_{check}'] if check is not None else [c for c in df.columns if c.startswith('margin_')]
+        df['margin'] = df[ms].min(axis=1) if ms else np.nan
+        return df.dropna(subset='margin').nsmallest(n, 'margin')
+
+    def reruns(self) -> list:
+        """
+        :return: step identities of failed epochs, see Plan.select
+        """
+        return [self.fields(k) for k, passed in enumerate(self.cols['passed']) if not passed]
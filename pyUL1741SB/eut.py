@@ -322,6 +322,33 @@ class Eut:
         # der capable rocof, should exceed required value from aopCat
         self.demonstrable_rocof = kwargs['demonstrable_rocof']
         self.delta_Psmall = kwargs['delta_Psmall']  # see fw tests
+        # identity of the unit under test, keys its runs in a pyUL1741SB.store.ResultStore
+        self.ident = kwargs.get('ident')
+        self.firmware = kwargs.get('firmware')
+
+    @classmethod
+    def from_config(cls, cfg: dict):
+        """
+        construct from a picklable config dict, i.e. in a worker process (see pyUL1741SB.runner)
+        subclasses owning a simulator or instrument handle open it here
+        """
+        return cls(**cfg)
+
+    def snapshot(self):
+        """
+        capture the device state for restore(), None if it can't be restored (i.e. real hardware)
+        """
+        return None
+
+    def restore(self, snap):
+        raise NotImplementedError
+
+    def settle_key(self):
+        """
+        hashable configuration and inputs (including the ac source setpoint) of the device, states with equal keys
+        settle to the same steady state. None if unknown
+        """
+        return None
 
     def dc_config(self, **kwargs):
         pass
@@ -0,0 +1,230 @@
+"""
+columnar measurement buffer shared by Env implementations
+"""
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pandas as pd
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def dt_ns(t: datetime) -> int:
+    # datetime has microsecond resolution, exact in int64 ns
+    epoch = EPOCH if t.tzinfo is None else EPOCH_UTC
+    return (t - epoch) // timedelta(microseconds=1) * 1000
+
+
+def td_ns(td: timedelta) -> int:
+    return td // timedelta(microseconds=1) * 1000
+
+
+class MeasBuffer:
+    '''
+    growable columnar store: int64 ns timestamps plus one float64 column per measured quantity.
+    rows are only ever appended, until clear(); DataFrames are handed out as read-only views on request.
+    '''
+    def __init__(self, cols=('P', 'Q', 'V', 'F'), capacity=1024):
+        self.n = 0
+        self.tz = None
+        self.t = np.empty(capacity, dtype=np.int64)
+        self.data = {}
+        for c in cols:
+            self._col(c)
+
+    def __len__(self):
+        return self.n
+
+    @property
+    def cols(self):
+        return tuple(self.data.keys())
+
+    def _col(self, c):
+        if c not in self.data:
+            self.data[c] = np.full(len(self.t), np.nan)
+        return self.data[c]
+
+    def _reserve(self, n):
+        cap = len(self.t)
+        if n <= cap:
+            return
+        while cap < n:
+            cap *= 2
+        t = np.empty(cap, dtype=np.int64)
+        t[:self.n] = self.t[:self.n]
+        self.t = t
+        for c, a in self.data.items():
+            b = np.full(cap, np.nan)
+            b[:self.n] = a[:self.n]
+            self.data[c] = b
+
+    def ns(self, t: datetime) -> int:
+        # the first timestamp seen decides the tz of the DataFrame views
+        if self.n == 0 and self.tz is None:
+            self.tz = t.tzinfo
+        return dt_ns(t)
+
+    def append(self, t: datetime, **vals) -> int:
+        """
+        :return: row position of the new sample
+        """
+        i = self.n
+        self._reserve(i + 1)
+        self.t[i] = self.ns(t)
+        for c, v in vals.items():
+            self._col(c)[i] = v
+        self.n = i + 1
+        return i
+
+    def extend(self, t_ns: np.ndarray, **cols):
+        """
+        :param t_ns: int64 ns timestamps, same tz convention as ns()
+        :return: (start, end) row positions of the new samples
+        """
+        i0 = self.n
+        i1 = i0 + len(t_ns)
+        self._reserve(i1)
+        self.t[i0:i1] = t_ns
+        for c, a in cols.items():
+            self._col(c)[i0:i1] = a
+        self.n = i1
+        return i0, i1
+
+    def extend_df(self, df: pd.DataFrame):
+        """
+        :param df: samples with a DatetimeIndex, as Envs written to the DataFrame interface return them
+        :return: (start, end) row positions of the new samples
+        """
+        if len(df) == 0:
+            return self.n, self.n
+        self.ns(df.index[0].to_pydatetime())
+        return self.extend(df.index.as_unit('ns').asi8, **{c: df[c].to_numpy(np.float64) for c in df.columns})
+
+    def row(self, i, cols):
+        return [self.data[c][i] for c in cols]
+
+    def index(self, i0, i1) -> pd.DatetimeIndex:
+        return self.to_index(self.t[i0:i1])
+
+    def to_index(self, t_ns: np.ndarray) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(t_ns.view('datetime64[ns]'))
+        if self.tz is not None:
+            idx = idx.tz_localize('UTC').tz_convert(self.tz)
+        return idx
+
+    def df(self, i0=0, i1=None, cols=None) -> pd.DataFrame:
+        i1 = self.n if i1 is None else i1
+        cols = self.cols if cols is None else cols
+        data = {}
+        for c in cols:
+            a = self.data[c][i0:i1]
+            a.flags.writeable = False
+            data[c] = a
+        return pd.DataFrame(data, index=self.index(i0, i1), copy=False)
+
+    def clear(self, capacity=None):
+        # fresh arrays, views handed out earlier stay valid. the tz stays, views index by it
+        tz = self.tz
+        self.__init__(self.cols, len(self.t) if capacity is None else capacity)
+        self.tz = tz
+
+
+class EpochView:
+    '''
+    rows i0:i1 of a MeasBuffer, as step response validators receive them.
+    times and columns are array views; points of interest resolve to integer positions with one searchsorted and
+    means come from cumulative sums. the DataFrame is only built when asked for (df), i.e. to record the epoch.
+    '''
+    def __init__(self, buf: MeasBuffer, i0, i1, cols):
+        self.buf = buf
+        self.i0 = i0
+        self.i1 = i1
+        self.cols = tuple(cols)
+        # rows already written are never touched again, the view stays valid when buf grows or is cleared
+        self.t = buf.t[i0:i1]
+        self.data = {c: buf.data[c][i0:i1] for c in self.cols}
+        self.attrs = {}  # copied to df when it is built, set before
+        self._df = None
+        self._csum = {}
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame):
+        """
+        view over a copy of a recorded DataFrame, i.e. a replayed step
+        """
+        buf = MeasBuffer(df.columns, max(len(df), 1))
+        buf.tz = df.index.tz
+        buf.extend(df.index.as_unit('ns').asi8, **{c: df[c].to_numpy() for c in df.columns})
+        view = cls(buf, 0, len(df), df.columns)
+        view.attrs = dict(df.attrs)
+        view._df = df
+        return view
+
+    def __len__(self):
+        return self.i1 - self.i0
+
+    def col(self, c) -> np.ndarray:
+        return self.data[c]
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            for a in self.data.values():
+                a.flags.writeable = False
+            self._df = pd.DataFrame(self.data, index=self.buf.to_index(self.t), copy=False)
+            self._df.attrs = self.attrs
+        return self._df
+
+    def asof(self, t_ns):
+        """
+        :return: position of the last sample at or before each t_ns, like DatetimeIndex.asof
+        """
+        return np.searchsorted(self.t, t_ns, side='right') - 1
+
+    def ts_of_interest(self, olrt: timedelta):
+        """
+        positions of interest of a step response: init, olrt and 2 * olrt after the step at row 1, last
+        """
+        p_olrt, p_ss0 = self.asof(self.t[1] + np.array([1, 2], dtype=np.int64) * td_ns(olrt))
+        return 0, int(p_olrt), int(p_ss0), len(self) - 1
+
+    def ts(self, *ps):
+        """
+        :return: timestamps at positions ps
+        """
+        return tuple(self.buf.to_index(self.t[list(ps)]))
+
+    def at(self, c, p):
+        return self.col(c)[p]
+
+    def weights(self) -> np.ndarray:
+        """
+        time each sample stands for: the interval to the next sample, the last one takes the interval before it.
+        all equal when sampling is uniform
+        """
+        if len(self) < 2:
+            return np.ones(len(self))
+        dt = np.diff(self.t).astype(np.float64)
+        return np.append(dt, dt[-1])
+
+    def mean(self, c, p0=0, p1=None):
+        """
+        time weighted mean of column c over positions p0:p1, NaN skipped. the plain mean when sampling is uniform,
+        not biased towards densely sampled stretches when it is not (see IEEE1547.sample_offsets)
+        """
+        p1 = len(self) if p1 is None else p1
+        if c not in self._csum:
+            a = self.col(c)
+            ok = ~np.isnan(a)
+            w = np.where(ok, self.weights(), 0.)
+            self._csum[c] = (np.concatenate(([0.], np.cumsum(np.where(ok, a, 0.) * w))),
+                             np.concatenate(([0.], np.cumsum(w))))
+        s, n = self._csum[c]
+        wsum = n[p1] - n[p0]
+        return (s[p1] - s[p0]) / wsum if wsum else np.nan
+
+    def t_rel(self, p=1) -> np.ndarray:
+        """
+        seconds of every sample from the sample at position p
+        """
+        return (self.t - self.t[p]) / 1e9
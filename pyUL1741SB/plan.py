@@ -0,0 +1,209 @@
+"""
+test plan compiler: run procedures against a tracing Env/Eut to get a flat list of steps
+
+every Env/Eut call a procedure makes is recorded as an op, and the ops are cut into steps at each recorded epoch.
+measurements are synthetic nominal values, so data dependent loops (cease to energize, vref settling,
+early stop) are compiled along the path nominal values take. that is not a bound on a real run: cease to
+energize never passes and runs its full window, but the vref loop of vv_vref_validate breaks as soon as Q reads
+valid and early stop ends windows at their minimum, where a real eut may take up to the full window.
+"""
+import copy
+from datetime import timedelta, datetime, timezone
+import numpy as np
+import pandas as pd
+from pyUL1741SB.env import Env
+from pyUL1741SB.eut import Eut
+from pyUL1741SB.meas import MeasBuffer, td_ns
+from pyUL1741SB.runner import nop
+
+
+class Op:
+    def __init__(self, target, name, args, kwargs):
+        self.target = target  # 'env' or 'eut'
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    def __repr__(self):
+        params = [repr(a) for a in self.args] + [f'{k}={v!r}' for k, v in self.kwargs.items()]
+        return f"{self.target}.{self.name}({', '.join(params)})"
+
+
+class Plan:
+    '''
+    steps: one dict per recorded epoch
+        proc, label, fields (step identity, values as labelled), ops, dwell (s), olrt (s or None), samples,
+        state (env settings and latest arguments of every eut setter at the end of the step)
+    '''
+    def __init__(self):
+        self.steps = []
+        self.ops = []
+        self.state = {}
+        self.proc = None
+        self.t = timedelta(0)  # simulated time since the last cut
+        self.samples = 0
+        self.olrt = None
+
+    def record(self, target, name, args, kwargs):
+        self.ops.append(Op(target, name, args, kwargs))
+        if target == 'env' and name == 'ac_config':
+            self.state.update(kwargs)
+        elif target == 'eut' and (name.startswith('set_') or name == 'dc_config'):
+            self.state[name] = {**self.state.get(name, {}), **dict(enumerate(args)), **kwargs}
+
+    def cut(self, epoch=None):
+        if epoch is None and not self.ops:
+            return
+        self.steps.append({
+            'proc': self.proc,
+            'label': '' if epoch is None else epoch['label'],
+            'fields': {} if epoch is None else {k: str(v) for k, v in epoch['fields'].items()},
+            'ops': self.ops,
+            'dwell': self.t.total_seconds(),
+            'olrt': self.olrt,
+            'samples': self.samples,
+            'state': copy.deepcopy(self.state),
+        })
+        self.ops, self.t, self.samples, self.olrt = [], timedelta(0), 0, None
+
+    def select(self, lst_fields) -> list:
+        """
+        :param lst_fields: step identities, i.e. EpochTable.reruns() of a previous run
+        :return: indices of the matching steps, for run_plan
+        """
+        keys = {tuple((k, str(v)) for k, v in fields.items()) for fields in lst_fields}
+        return [k for k, step in enumerate(self.steps) if tuple(step['fields'].items()) in keys]
+
+    def df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [{k: v for k, v in step.items() if k not in ('ops', 'state', 'fields')} for step in self.steps],
+            columns=['proc', 'label', 'dwell', 'olrt', 'samples'])
+
+    def summary(self) -> pd.DataFrame:
+        """
+        bench time per procedure
+        """
+        df = self.df()
+        df = df.groupby('proc', sort=False).agg(steps=('label', 'size'), dwell=('dwell', 'sum'),
+                                                samples=('samples', 'sum'))
+        df['hours'] = df['dwell'] / 3600
+        return df
+
+
+class PlanEnv(Env):
+    '''
+    records every call into a Plan, advances a simulated clock and returns nominal measurements
+    '''
+    def __init__(self, plan: Plan, eut: Eut, t_meas=0.01):
+        super().__init__()
+        self.plan = plan
+        self.eut = eut
+        self.time = datetime.fromtimestamp(0, tz=timezone.utc)
+        self.t_meas = timedelta(seconds=t_meas)  # time taken by a single measurement
+        self.vac, self.freq = eut.VN, eut.fN
+
+    def _advance(self, td):
+        self.time += td
+        self.plan.t += td
+
+    def nominal(self, n=1):
+        return {'P': np.full(n, float(self.eut.Prated)), 'Q': np.zeros(n),
+                'V': np.full(n, float(self.vac)), 'F': np.full(n, float(self.freq))}
+
+    def sleep(self, td: timedelta):
+        self.plan.record('env', 'sleep', (td,), {})
+        self._advance(td)
+
+    def meas_row(self, *args) -> int:
+        self.plan.record('env', 'meas_row', args, {})
+        i = self.mbuf.append(self.time, **{k: v[0] for k, v in self.nominal().items()})
+        self.plan.samples += 1
+        self._advance(self.t_meas)
+        return i
+
+    def meas_into(self, buf: MeasBuffer, n: int, tres: timedelta, *args):
+        t_ns = buf.ns(self.time) + np.arange(n, dtype=np.int64) * td_ns(tres)
+        self.plan.samples += n
+        self._advance(n * tres)
+        return buf.extend(t_ns, **self.nominal(n))
+
+    def meas_for(self, dur: timedelta, tres: timedelta, *args) -> pd.DataFrame:
+        self.plan.record('env', 'meas_for', (dur, tres, *args), {})
+        i0, i1 = self.meas_into(self.mbuf, -(-dur // tres), tres, *args)
+        return self.mbuf.df(i0, i1, args)
+
+    def annotate(self, **kwargs):
+        if 'olrt' in kwargs:
+            self.plan.olrt = kwargs['olrt'].total_seconds()
+
+    def ac_config(self, **kwargs):
+        self.plan.record('env', 'ac_config', (), kwargs)
+        self.vac = kwargs.get('Vac', self.vac)
+        self.freq = kwargs.get('freq', self.freq)
+
+    def ac_config_asym(self, **kwargs):
+        self.plan.record('env', 'ac_config_asym', (), kwargs)
+
+    def log(self, **kwargs):
+        pass
+
+
+class PlanEut:
+    '''
+    nameplate of a real Eut, with every setter recorded into a Plan instead of applied
+    '''
+    def __init__(self, plan: Plan, eut: Eut):
+        self.plan = plan
+        self.eut = eut
+
+    def __getattr__(self, name):
+        if name.startswith('set_') or name == 'dc_config':
+            return lambda *args, **kwargs: self.plan.record('eut', name, args, kwargs)
+        return getattr(self.eut, name)
+
+    def has_tripped(self):
+        return False
+
+    def snapshot(self):
+        return None
+
+
+def compile_plan(std_cls, eut: Eut, procs, plan: Plan = None) -> Plan:
+    """
+    :param std_cls: IEEE1547 subclass constructed as std_cls(env, eut), i.e. the bench's UL1741SB subclass
+    :param procs: procedure entry point names, i.e. ('cpf', 'vv_vref', 'ovt')
+    """
+    plan = Plan() if plan is None else plan
+    peut = PlanEut(plan, eut)
+    penv = PlanEnv(plan, peut)
+    for proc in procs:
+        std = std_cls(penv, peut)
+        std.validator_opts = {'on_epoch': plan.cut, 'report': None}
+        plan.proc = proc
+        getattr(std, proc)(None, nop)
+        # teardown after the last epoch
+        plan.cut()
+    return plan
+
+
+def dry_run(std_cls, eut: Eut, procs) -> pd.DataFrame:
+    """
+    bench time per procedure without touching hardware
+    """
+    return compile_plan(std_cls, eut, procs).summary()
+
+
+def run_plan(plan: Plan, env: Env, eut: Eut, steps=None):
+    """
+    generic engine: execute the ops of the plan's steps in order against a real Env/Eut
+    :param steps: indices into plan.steps, all of them by default
+    :return: list of (step, df_meas) with everything measured during each step
+    """
+    out = []
+    for k in range(len(plan.steps)) if steps is None else steps:
+        step = plan.steps[k]
+        i0 = len(env.mbuf)
+        for op in step['ops']:
+            getattr(env if op.target == 'env' else eut, op.name)(*op.args, **op.kwargs)
+        out.append((step, env.mbuf.df(i0, len(env.mbuf))))
+    return out
@@ -0,0 +1,114 @@
+"""
+offline replay: re-run procedures against recorded captures (see pyUL1741SB.capture) instead of an EUT
+
+the procedure runs as on the bench and applies the same perturbations in the same order; every step gets its
+recorded measurements back (see IEEE1547.replay) and is validated with the current criteria. the Env keeps simulated
+time, sleeps cost nothing, and the few measurements taken outside of steps (i.e. waiting for re-energization) read
+nominal values. the run ends where the capture does.
+"""
+import traceback
+import numpy as np
+from pyUL1741SB.env import Env
+from pyUL1741SB.eut import Eut
+from pyUL1741SB.meas import MeasBuffer, td_ns
+from pyUL1741SB.capture import CaptureExhausted
+from pyUL1741SB.runner import ProcSpec, summary, run_pool, nop
+from pyUL1741SB.viz import write_index
+
+
+class ReplayEnv(Env):
+    def __init__(self, eut: Eut):
+        super().__init__()
+        self.eut = eut
+        self.vac, self.freq = eut.VN, eut.fN
+
+    def nominal(self, n=1):
+        return {'P': np.full(n, float(self.eut.Prated)), 'Q': np.zeros(n),
+                'V': np.full(n, float(self.vac)), 'F': np.full(n, float(self.freq))}
+
+    def sleep(self, td):
+        self.time += td
+
+    def meas_row(self, *args) -> int:
+        return self.mbuf.append(self.time, **{k: v[0] for k, v in self.nominal().items() if k in args})
+
+    def meas_into(self, buf: MeasBuffer, n: int, tres, *args):
+        t_ns = buf.ns(self.time) + np.arange(n, dtype=np.int64) * td_ns(tres)
+        self.time += n * tres
+        return buf.extend(t_ns, **{k: v for k, v in self.nominal(n).items() if k in args})
+
+    def ac_config(self, **kwargs):
+        self.vac = kwargs.get('Vac', self.vac)
+        self.freq = kwargs.get('freq', self.freq)
+
+    def ac_config_asym(self, **kwargs):
+        pass
+
+    def log(self, **kwargs):
+        pass
+
+
+class ReplayEut:
+    '''
+    nameplate of a real Eut, every setter ignored
+    '''
+    def __init__(self, eut: Eut):
+        self.eut = eut
+
+    def __getattr__(self, name):
+        if name.startswith('set_') or name == 'dc_config':
+            return lambda *args, **kwargs: None
+        return getattr(self.eut, name)
+
+    def has_tripped(self):
+        return False
+
+    def snapshot(self):
+        return None
+
+
+def revalidate(std_cls, eut: Eut, proc, capture, outdir=None, index=True, **kwargs):
+    """
+    :param std_cls: IEEE1547 subclass constructed as std_cls(env, eut), i.e. the bench's UL1741SB subclass
+    :param capture: capture file of proc, i.e. '{dir}{proc}.arrow' of a run with validator_opts
+        {'store': {'capture': dir}}
+    :param outdir: where the report is drawn, None for no report
+    :param index: rebuild index.html after a slim report, see Report
+    :return: viz.Validator of the replayed run
+    """
+    std = std_cls(ReplayEnv(eut), ReplayEut(eut))
+    report = None if outdir is None else {**(std.validator_opts.get('report') or {}), 'index': index}
+    std.validator_opts = {**std.validator_opts, 'replay_from': capture, 'report': report}
+    try:
+        getattr(std, proc)(outdir, nop, **kwargs)
+    except CaptureExhausted:
+        # capture of an interrupted run, the entry point has drawn what it holds
+        pass
+    return std.validator
+
+
+def revalidate_spec(spec: ProcSpec, capture, outdir):
+    """
+    worker entry point
+    :return: (validator, formatted traceback or None)
+    """
+    try:
+        eut = spec.eut_cls.from_config(spec.eut_cfg)
+        # index.html is rebuilt once by revalidate_all
+        return revalidate(spec.std_cls, eut, spec.proc, capture, outdir, False, **spec.kwargs), None
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def revalidate_all(jobs, outdir=None, max_workers=None, log=print):
+    """
+    re-validate an archive of captures in parallel, one worker process per capture. spec.env_cls is not used.
+    :param jobs: list of (ProcSpec, capture file)
+    :return: ({label: Validator}, {label: traceback}), the merged epoch table goes to {outdir}summary.csv
+    """
+    validators, errors = run_pool(
+        {spec.label: (revalidate_spec, spec, capture, outdir) for spec, capture in jobs}, max_workers, log)
+    if outdir is not None:
+        summary(validators).to_csv(f'{outdir}summary.csv', index=False)
+        write_index(outdir)
+    return validators, errors
@@ -0,0 +1,114 @@
+"""
+run independent procedures on simulated EUTs in parallel, one simulator instance per worker process
+"""
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from pyUL1741SB.store import ResultStore
+from pyUL1741SB.viz import write_index
+
+
+class ProcSpec:
+    '''
+    picklable description of one procedure run: std_cls(env_cls(eut), eut).<proc>(outdir, final, **kwargs)
+    where eut = eut_cls.from_config(eut_cfg). classes and final must be importable at module level.
+    validator_opts are set on the std, i.e. {'store': {'capture': dir}} to keep the raw measurements for the result
+    store
+    '''
+    def __init__(self, proc, std_cls, env_cls, eut_cls, eut_cfg=None, final=None, label=None, validator_opts=None,
+                 **kwargs):
+        self.proc = proc
+        self.std_cls = std_cls
+        self.env_cls = env_cls
+        self.eut_cls = eut_cls
+        self.eut_cfg = {} if eut_cfg is None else eut_cfg
+        self.final = final
+        self.label = proc if label is None else label
+        self.validator_opts = {} if validator_opts is None else validator_opts
+        self.kwargs = kwargs
+
+
+def nop():
+    pass
+
+
+def run_spec(spec: ProcSpec, outdir):
+    """
+    worker entry point
+    :return: (validator, formatted traceback or None)
+    """
+    eut = spec.eut_cls.from_config(spec.eut_cfg)
+    env = spec.env_cls(eut)
+    std = spec.std_cls(env, eut)
+    opts = {**std.validator_opts, **spec.validator_opts}
+    # index.html is rebuilt once by run_procs, workers would race on it
+    if opts.get('report', {}) is not None:
+        opts['report'] = {**opts.get('report', {}), 'index': False}
+    std.validator_opts = opts
+    err = None
+    try:
+        getattr(std, spec.proc)(outdir, spec.final or nop, **spec.kwargs)
+    except Exception:
+        err = traceback.format_exc()
+    return getattr(std, 'validator', None), err
+
+
+def summary(validators: dict) -> pd.DataFrame:
+    cols = ['run', 'proc', 'start', 'end', 'label', 'passed', 'stop', 'violation']
+    lst = []
+    for label, validator in validators.items():
+        if validator is None:
+            continue
+        df = validator.epochs.df(labels=True)
+        df.insert(0, 'run', label)
+        lst.append(df)
+    if not lst:
+        return pd.DataFrame(columns=cols)
+    # identity fields, checks and buffer rows after the fixed columns
+    df = pd.concat(lst, ignore_index=True)
+    return df[cols + [c for c in df.columns if c not in cols]]
+
+
+def run_pool(tasks: dict, max_workers=None, log=print):
+    """
+    one fresh worker process per task
+    :param tasks: {label: (fn, *args)}, fn a module level worker entry point returning (validator, traceback or None)
+    :return: ({label: Validator}, {label: traceback}), validators in the order of tasks
+    """
+    validators, errors = {}, {}
+    max_workers = max_workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=max_workers, max_tasks_per_child=1) as pool:
+        futs = {pool.submit(*task): label for label, task in tasks.items()}
+        for fut in as_completed(futs):
+            label = futs[fut]
+            try:
+                validators[label], err = fut.result()
+            except Exception:
+                validators[label], err = None, traceback.format_exc()
+            if err is not None:
+                errors[label] = err
+            log(f'{label}: {"error" if err else "done"}')
+    return {label: validators[label] for label in tasks}, errors
+
+
+def run_procs(specs, outdir, max_workers=None, log=print, store=None):
+    """
+    fan specs out over a process pool; each task gets a fresh worker process so simulator globals
+    (e.g. a loaded controller library) are never shared between procedures.
+    per procedure reports are drawn by the workers as usual, the merged epoch table goes to {outdir}summary.csv
+    :param store: path of a pyUL1741SB.store.ResultStore the runs are added to, keyed by eut_cfg ident and firmware.
+        epochs point to their raw measurements for specs with a capture in validator_opts
+    :return: ({label: Validator}, {label: traceback}) for all specs
+    """
+    validators, errors = run_pool({spec.label: (run_spec, spec, outdir) for spec in specs}, max_workers, log)
+    summary(validators).to_csv(f'{outdir}summary.csv', index=False)
+    write_index(outdir)
+    if store is not None:
+        with ResultStore(store) as rs:
+            for spec in specs:
+                validator = validators[spec.label]
+                if validator is not None:
+                    rs.add_run(validator, spec.eut_cfg.get('ident'), spec.eut_cfg.get('firmware'), spec.label,
+                               blob=validator.store.capture_path)
+    return validators, errors
@@ -0,0 +1,228 @@
+"""
+reconfiguration aware scheduling of a compiled test plan
+
+steps are grouped into blocks, each opening with the setup that brings the eut to the block's configuration and waits
+for it to settle. where the standard leaves the order of blocks free, blocks are reordered greedily so the next block is
+always the one closest to the configuration already in place, and setups that would re-establish the current settled
+state are dropped altogether.
+
+settling is modelled as first order: a wait sized for a full scale step shrinks to ln(d / tol) / ln(1 / tol) of itself
+for a step of relative size d, and vanishes for d <= tol.
+"""
+import copy
+import numbers
+import numpy as np
+import pandas as pd
+from pyUL1741SB.plan import Plan, Op
+
+'''
+procedure entry point: (label field, values of that field opening a block)
+blocks of one procedure may run in any order, steps within a block keep theirs.
+trip tests (ovt, uvt, oft, uft) are left out: their setup waits are trip resets owed after every trip whatever the
+order, and repeats already fork from a snapshot. ride-through sequences (lvrt, hvrt, lfrt, hfrt) are ordered by the
+standard.
+'''
+BLOCKS = {
+    'cpf': ('Step', ('g',)),
+    'crp': ('Step', ('g',)),
+    'lap': ('step', ('c',)),
+    'pri': ('step', ('1',)),
+    'vv_char1': ('step', ('g',)),
+    'vv_char23': ('step', ('g',)),
+    'vv_vref': ('step', ('h',)),
+    'fwo': ('step', ('h',)),
+    'fwu': ('step', ('g',)),
+    'es_ramp': ('step', ('c',)),
+}
+
+MEAS_OPS = ('meas_row', 'meas_for')
+
+
+def dist(a, b) -> float:
+    """
+    relative distance between two recorded settings, 0 if equal and 1 for anything not comparable
+    """
+    if a is b:
+        return 0.
+    if isinstance(a, numbers.Real) and isinstance(b, numbers.Real):
+        if a == b:
+            return 0.
+        scale = max(abs(a), abs(b))
+        return min(1., abs(a - b) / scale) if np.isfinite(scale) else 1.
+    if isinstance(a, dict) and isinstance(b, dict):
+        return max((dist(a.get(k), b.get(k)) if k in a and k in b else 1. for k in a.keys() | b.keys()), default=0.)
+    if isinstance(a, (list, tuple, np.ndarray)) and isinstance(b, (list, tuple, np.ndarray)):
+        if len(a) != len(b):
+            return 1.
+        return max((dist(x, y) for x, y in zip(a, b)), default=0.)
+    if type(a) is type(b) and hasattr(a, '__dict__'):
+        # curves and similar parameter objects, deep copied with the plan state
+        return dist(vars(a), vars(b))
+    try:
+        return 0. if a == b else 1.
+    except Exception:
+        return 1.
+
+
+def settle_frac(d, tol=0.01) -> float:
+    if d <= tol:
+        return 0.
+    return min(1., np.log(d / tol) / np.log(1 / tol))
+
+
+def apply(state: dict, op: Op):
+    # same bookkeeping as Plan.record
+    if op.target == 'env' and op.name == 'ac_config':
+        state.update(op.kwargs)
+    elif op.target == 'eut' and (op.name.startswith('set_') or op.name == 'dc_config'):
+        state[op.name] = {**state.get(op.name, {}), **dict(enumerate(op.args)), **op.kwargs}
+
+
+def state_ops(state: dict, keys) -> list:
+    """
+    ops that establish the given entries of a plan state
+    """
+    ops, ac = [], {}
+    for k in keys:
+        v = state[k]
+        if isinstance(v, dict):
+            args = tuple(v[i] for i in sorted(i for i in v if isinstance(i, int)))
+            ops.append(Op('eut', k, args, {i: x for i, x in v.items() if not isinstance(i, int)}))
+        else:
+            ac[k] = v
+    if ac:
+        ops.append(Op('env', 'ac_config', (), ac))
+    return ops
+
+
+class Block:
+    def __init__(self, steps, start: dict):
+        self.steps = steps
+        self.start = start  # plan state the block was compiled from
+        self.end = steps[-1]['state']
+        ops = steps[0]['ops']
+        i_meas = next((i for i, op in enumerate(ops) if op.name in MEAS_OPS), len(ops))
+        i_sleep = [i for i, op in enumerate(ops[:i_meas]) if op.name == 'sleep']
+        # setup: everything up to the last wait before the first measurement
+        self.n_setup = i_sleep[-1] + 1 if i_sleep else 0
+        self.settle = sum(ops[i].args[0].total_seconds() for i in i_sleep)
+        self.needs = copy.deepcopy(start)
+        self.writes = set()
+        for op in ops[:self.n_setup]:
+            apply(self.needs, op)
+            if op.name == 'ac_config':
+                self.writes |= op.kwargs.keys()
+            elif op.name != 'sleep':
+                self.writes.add(op.name)
+
+    def jump(self, state: dict) -> float:
+        return max((dist(v, state.get(k)) if k in state else 1. for k, v in self.needs.items()), default=0.)
+
+
+def split(steps, field, leads, state: dict):
+    """
+    :return: (fixed steps before the first block, blocks, fixed steps after the last block)
+    """
+    head, blocks, tail = [], [], []
+    for step in steps:
+        if not step['label']:
+            # teardown after the last epoch
+            tail.append(step)
+        elif step['fields'].get(field) in leads:
+            blocks.append([step])
+        elif blocks:
+            blocks[-1].append(step)
+        else:
+            head.append(step)
+    out = []
+    state = head[-1]['state'] if head else state
+    for steps in blocks:
+        out.append(Block(steps, state))
+        state = steps[-1]['state']
+    return head, out, tail
+
+
+def order(blocks, state: dict, tol=0.01):
+    """
+    greedy nearest neighbour: settling cost first, setpoint jump second, original order last.
+    the first block opens with the procedure's initial configuration and stays first.
+    :return: blocks in run order
+    """
+    if len(blocks) < 2:
+        return list(blocks)
+    out = [blocks[0]]
+    state = blocks[0].end
+    rest = list(blocks[1:])
+    while rest:
+        costs = [(b.settle * settle_frac(d, tol), d, k) for k, b in enumerate(rest) for d in (b.jump(state),)]
+        k = min(costs)[2]
+        out.append(rest.pop(k))
+        state = out[-1].end
+    return out
+
+
+def emit(blocks, state: dict, tol=0.01, trim=False):
+    """
+    steps of blocks in the given order, each block prefixed with the settings it was compiled against that differ from
+    the current ones, and stripped of its setup when the setup would change nothing. the first block also carries the
+    procedure's initial configuration and is never stripped.
+    :param trim: shorten setup waits to the modelled settling time instead of keeping them whole
+    :return: (steps, modelled settling time in s)
+    """
+    steps, total = [], 0.
+    for k, b in enumerate(blocks):
+        d = b.jump(state)
+        frac = settle_frac(d, tol)
+        total += b.settle * frac
+        first = dict(b.steps[0])
+        ops = first['ops']
+        if d == 0. and k > 0:
+            pre, setup = [], []
+        else:
+            stale = [key for key, v in b.start.items() if key not in b.writes and dist(v, state.get(key)) > 0]
+            pre = state_ops(b.start, stale)
+            setup = ops[:b.n_setup]
+            if trim:
+                setup = [Op(op.target, op.name, (op.args[0] * frac,), {}) if op.name == 'sleep' else op for op in setup]
+        first['ops'] = pre + setup + ops[b.n_setup:]
+        dropped = sum(op.args[0].total_seconds() for op in ops[:b.n_setup] if op.name == 'sleep') \
+            - sum(op.args[0].total_seconds() for op in setup if op.name == 'sleep')
+        first['dwell'] = b.steps[0]['dwell'] - dropped
+        steps += [first] + b.steps[1:]
+        state = b.end
+    return steps, total
+
+
+def schedule(plan: Plan, blocks: dict = None, tol=0.01, trim=False):
+    """
+    reorder the blocks of every procedure in blocks (BLOCKS by default), procedures keep their order
+    :param trim: see emit()
+    :return: (scheduled Plan, DataFrame of settling time per procedure in s)
+        settle: waits as compiled, settle_inorder: modelled in the default order, settle_sched: modelled as scheduled,
+        saved: settle_inorder - settle_sched, what reordering saves over the same model in the default order
+    """
+    blocks = BLOCKS if blocks is None else blocks
+    out = Plan()
+    rows = []
+    state = {}
+    i = 0
+    while i < len(plan.steps):
+        proc = plan.steps[i]['proc']
+        j = i
+        while j < len(plan.steps) and plan.steps[j]['proc'] == proc:
+            j += 1
+        steps = plan.steps[i:j]
+        if proc in blocks:
+            head, lst, tail = split(steps, *blocks[proc], state)
+            state_blocks = head[-1]['state'] if head else state
+            _, t_inorder = emit(lst, state_blocks, tol)
+            sched, t_sched = emit(order(lst, state_blocks, tol), state_blocks, tol, trim)
+            steps = head + sched + tail
+            rows.append({'proc': proc, 'blocks': len(lst), 'settle': sum(b.settle for b in lst),
+                         'settle_inorder': t_inorder, 'settle_sched': t_sched})
+        out.steps += steps
+        state = plan.steps[j - 1]['state']
+        i = j
+    df = pd.DataFrame(rows, columns=['proc', 'blocks', 'settle', 'settle_inorder', 'settle_sched']).set_index('proc')
+    df['saved'] = df['settle_inorder'] - df['settle_sched']
+    return out, df
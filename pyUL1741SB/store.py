@@ -0,0 +1,155 @@
+"""
+results of every run in one SQLite file, queryable across runs, EUTs and firmware versions
+
+runs: one row per Validator, keyed by EUT identity and firmware
+epochs: one row per epoch, the step identified by its label fields (see EpochTable) as canonical json
+checks: one row per check of an epoch, verdict and margin
+raw measurements are not copied in, epochs point to them: blob (a capture file) and rows i0:i1 of its batches
+read in order, both null for runs without a capture
+"""
+import json
+import sqlite3
+from datetime import datetime
+import pandas as pd
+
+SCHEMA = '''
+create table if not exists runs (
+    run integer primary key,
+    started text,
+    label text,
+    proc text,
+    eut text,
+    firmware text
+);
+create table if not exists epochs (
+    epoch integer primary key,
+    run integer not null references runs (run),
+    k integer,
+    proc text,
+    step text,
+    start text,
+    "end" text,
+    passed integer,
+    stop text,
+    violation text,
+    i0 integer,
+    i1 integer,
+    blob text
+);
+create table if not exists checks (
+    epoch integer not null references epochs (epoch),
+    name text,
+    passed integer,
+    margin real
+);
+create index if not exists runs_eut on runs (eut, firmware);
+create index if not exists epochs_run on epochs (run);
+create index if not exists epochs_step on epochs (proc, step);
+create index if not exists checks_epoch on checks (epoch, name);
+'''
+
+
+def step_key(fields: dict) -> str:
+    # values as labelled, so steps of different runs compare equal
+    return json.dumps({k: str(v) for k, v in fields.items()}, sort_keys=True)
+
+
+def ts(t):
+    return None if t is None else t.isoformat()
+
+
+class ResultStore:
+    def __init__(self, path):
+        self.path = path
+        self.con = sqlite3.connect(path)
+        self.con.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.con.close()
+
+    def add_run(self, validator, ident=None, firmware=None, label=None, blob=None) -> int:
+        """
+        :param validator: viz.Validator of a completed (or interrupted) procedure
+        :param ident: EUT identity, i.e. Eut.ident
+        :param firmware: EUT firmware version, i.e. Eut.firmware
+        :param blob: capture file of the run (see Validator capture), epochs point to their rows in it.
+            without one i0 and i1 are null, there is nothing to point into
+        :return: run id
+        """
+        epochs = validator.epochs
+        cols = epochs.cols
+        if blob is None:
+            rows = [(None, None)] * len(epochs)
+        else:
+            # batch k of the capture holds epoch k
+            rows = list(zip(cols['i0'], cols['i1']))
+        with self.con:
+            run = self.con.execute(
+                'insert into runs (started, label, proc, eut, firmware) values (?, ?, ?, ?, ?)',
+                (datetime.now().isoformat(), label or validator.proc, validator.proc, ident, firmware)).lastrowid
+            first = self.con.execute('select coalesce(max(epoch), 0) + 1 from epochs').fetchone()[0]
+            self.con.executemany(
+                'insert into epochs values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                ((first + k, run, k, cols['proc'][k], step_key(epochs.fields(k)), ts(cols['start'][k]),
+                  ts(cols['end'][k]), bool(cols['passed'][k]), cols['stop'][k], ts(cols['violation'][k]),
+                  *rows[k], blob) for k in range(len(epochs))))
+            names = [c[3:] for c in cols if c.startswith('ok_')]
+            self.con.executemany(
+                'insert into checks values (?, ?, ?, ?)',
+                ((first + k, name, ok, margin) for name in names
+                 for k, (ok, margin) in enumerate(zip(cols[f'ok_{name}'], cols[f'margin_{name}']))
+                 if ok is not None))
+        return run
+
+    def query(self, sql, params=()) -> pd.DataFrame:
+        return pd.read_sql_query(sql, self.con, params=params)
+
+    def epochs(self, proc='%', eut=None, firmware=None) -> pd.DataFrame:
+        """
+        :param proc: sql like pattern on the epoch's proc, i.e. 'vv%'
+        """
+        return self.query(
+            'select r.eut, r.firmware, e.* from epochs e join runs r using (run) '
+            'where e.proc like ? and (? is null or r.eut = ?) and (? is null or r.firmware = ?) order by e.epoch',
+            (proc, eut, eut, firmware, firmware))
+
+    def firmwares(self, eut=None) -> list:
+        """
+        :return: firmware versions of eut in the order they were first run
+        """
+        return list(self.query(
+            'select firmware from runs where (? is null or eut = ?) and firmware is not null '
+            'group by firmware order by min(run)', (eut, eut))['firmware'])
+
+    def drift(self, proc, check, shrink=0., eut=None, old=None, new=None) -> pd.DataFrame:
+        """
+        steps whose margin on check shrank by more than shrink between two firmware versions,
+        i.e. drift('vv%', 'ss_valid', 50.) for vv steps that lost over 50 var of margin since the previous firmware
+        repeated runs of a step count with their smallest margin
+        :param old, new: firmware versions, by default the last two run on eut
+        :return: df proc step old new shrink, largest shrink first
+        """
+        if old is None or new is None:
+            lst = self.firmwares(eut)
+            if len(lst) < 2:
+                return pd.DataFrame(columns=['proc', 'step', 'old', 'new', 'shrink'])
+            old, new = lst[-2] if old is None else old, lst[-1] if new is None else new
+        sql = '''
+        with m as (
+            select r.firmware, e.proc, e.step, min(c.margin) as margin
+            from checks c join epochs e using (epoch) join runs r using (run)
+            where c.name = ? and e.proc like ? and (? is null or r.eut = ?) and r.firmware in (?, ?)
+            group by r.firmware, e.proc, e.step
+        )
+        select a.proc, a.step, a.margin as old, b.margin as new, a.margin - b.margin as shrink
+        from m a join m b on a.proc = b.proc and a.step = b.step and a.firmware = ? and b.firmware = ?
+        where a.margin - b.margin > ?
+        order by shrink desc
+        '''
+        return self.query(sql, (check, proc, eut, eut, old, new, old, new, shrink))
@@ -0,0 +1,16 @@
+from pyUL1741SB.IEEE1547.VoltReg.cpf import CPF
+from pyUL1741SB.IEEE1547.VoltReg.crp import CRP
+from pyUL1741SB.IEEE1547.VoltReg.vv import VV
+from pyUL1741SB.IEEE1547.VoltReg.vw import VW
+from pyUL1741SB.IEEE1547.VoltReg.wv import WV
+from pyUL1741SB.IEEE1547.FreqSupp import FreqSupp
+from pyUL1741SB.IEEE1547.LimitAP import LAP
+from pyUL1741SB.IEEE1547.RespPri import RespPri
+from pyUL1741SB.IEEE1547.EnterService import ES
+from pyUL1741SB.IEEE1547.VoltDistResp import VoltDist
+from pyUL1741SB.IEEE1547.FreqDistResp import FreqDist
+from pyUL1741SB.IEEE1547 import IEEE1547
+
+
+class UL1741SB(CPF, CRP, VV, VW, WV, FreqSupp, RespPri, LAP, ES, VoltDist, FreqDist, IEEE1547):
+    pass
@@ -1,7 +1,18 @@
-import plotly
-import plotly.graph_objs as go
-from plotly.subplots import make_subplots
+import os
+import base64
+import glob
+import gzip
+import html
+import pickle
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
+from pyUL1741SB.meas import EpochView
+from pyUL1741SB.epochs import EpochTable
+from pyUL1741SB.capture import Capture, CaptureExhausted, MeasStore
+from pyUL1741SB.IEEE1547 import crit
 
 boolean_palette = {
     False: 'rgba(215, 25, 25, 0.05)',
@@ -16,30 +27,285 @@ dct_trace_order = {
 }
 
 
-class Validator:
-    def __init__(self, proc):
-        self.proc = proc
+'''
+slim reports: {proc}.html is a small page loading the shared plotly-{version}.min.js and its figure from {proc}.fig.js,
+the figure json gzipped and base64 encoded. the figure script is loaded async (a script tag, so pages open from file://)
+and inflated in the browser. index.html links every report in the directory.
+'''
+SLIM_PAGE = '''<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{plotly_js}"></script>
+<style>html, body, #fig {{ height: 100%; margin: 0; }}</style>
+</head>
+<body>
+<div id="fig">loading {title}...</div>
+<script>
+function show(b64) {{
+    const bytes = Uint8Array.from(atob(b64), c => c.charCodeAt(0));
+    const json = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+    new Response(json).json().then(fig => {{
+        document.getElementById('fig').textContent = '';
+        Plotly.newPlot('fig', fig.data, fig.layout, {{responsive: true}});
+    }});
+}}
+</script>
+<script src="{name}.fig.js" async></script>
+</body>
+</html>
+'''
 
-        # {'start': ts, 'end': ts, 'label': string, 'passed': bool}
-        self.epochs = []
-        self.meas = []  # df ts-index P Q V F
-        # one or multiple of P, Q, V, F. df ts-index min targ max
-        self.crit = {c: [] for c in ['P', 'Q', 'V', 'F']}
+INDEX_PAGE = '''<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>reports</title></head>
+<body>
+<ul>
+{items}
+</ul>
+</body>
+</html>
+'''
 
-    def record_epoch(self, df_meas, dct_crits, **kwargs):
-        self.meas.append(df_meas)
-        for c in dct_crits:
-            self.crit[c].append(dct_crits[c])
-        # unpack/pack to check fields are correct
-        self.epochs.append({
-            'start': kwargs['start'],
-            'end': kwargs['end'],
-            'label': kwargs['label'],
-            'passed': kwargs['passed']
-        })
-
-    def _draw_pqvf(self, fig):
-        df_meas = pd.concat(self.meas)
+
+def _plotly():
+    # plotly is imported when a report is first drawn, procedures and workers that draw nothing never load it
+    import plotly
+    import plotly.graph_objs
+    import plotly.offline
+    import plotly.subplots
+    return plotly
+
+
+def write_atomic(path, data: bytes):
+    # reports of parallel procedures share the directory, readers never see a partial file
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_slim(fig, outdir, name):
+    """
+    {outdir}{name}.html and {name}.fig.js, plotly-{version}.min.js once per directory and plotly version.
+    index.html is left to write_index
+    """
+    plotly = _plotly()
+    plotly_js = f'plotly-{plotly.__version__}.min.js'
+    if not os.path.exists(f'{outdir}{plotly_js}'):
+        write_atomic(f'{outdir}{plotly_js}', plotly.offline.get_plotlyjs().encode())
+    b64 = base64.b64encode(gzip.compress(fig.to_json().encode(), compresslevel=6)).decode()
+    write_atomic(f'{outdir}{name}.fig.js', f'show("{b64}");\n'.encode())
+    write_atomic(f'{outdir}{name}.html', SLIM_PAGE.format(
+        title=html.escape(name.upper()), name=name, plotly_js=plotly_js).encode())
+
+
+def write_index(outdir):
+    """
+    {outdir}index.html linking every slim report in outdir, nothing if there is none. rebuilt once where parallel
+    drawers join (Renderer.join, run_procs), not by each of them
+    """
+    names = sorted(os.path.basename(p)[:-len('.fig.js')] for p in glob.glob(f'{glob.escape(outdir)}*.fig.js'))
+    if not names:
+        return
+    items = '\n'.join(f'<li><a href="{html.escape(n)}.html">{html.escape(n)}</a></li>' for n in names)
+    write_atomic(f'{outdir}index.html', INDEX_PAGE.format(items=items).encode())
+
+
+def load_checkpoint(path):
+    # complete records only, a tail cut short by a crash is dropped
+    recs = []
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    recs.append(pickle.load(f))
+                except (EOFError, pickle.UnpicklingError):
+                    break
+    return recs
+
+
+def write_checkpoint(path, recs):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        for rec in recs:
+            pickle.dump(rec, f)
+    os.replace(tmp, path)
+
+
+def minmax_idx(y, n_out):
+    """
+    decimation keeping peaks: the min and the max of y in each of about n_out / 2 equal buckets, and both ends
+    :return: sorted positions into y, all of them if y has no more than n_out or n_out is None
+    """
+    n = len(y)
+    if n_out is None or n <= n_out:
+        return np.arange(n)
+    b = max(n_out // 2 - 1, 1)
+    size = -(-n // b)
+    b = -(-n // size)
+    pad = b * size - n
+    nan = np.isnan(y)
+    lo = np.concatenate([np.where(nan, np.inf, y), np.full(pad, np.inf)]).reshape(b, size)
+    hi = np.concatenate([np.where(nan, -np.inf, y), np.full(pad, -np.inf)]).reshape(b, size)
+    base = np.arange(b) * size
+    idx = np.concatenate([[0, n - 1], base + lo.argmin(axis=1), base + hi.argmax(axis=1)])
+    return np.unique(np.minimum(idx, n - 1))
+
+
+def band_decimate(y_min, y_max, n_out):
+    """
+    decimation of a tolerance band to about n_out points: the lowest y_min and highest y_max of each bucket at its
+    first sample, so the band only widens. buckets holding NaN (a gap between epochs) end with a NaN point
+    :return: (positions, y_min, y_max), the band as it is if n_out is None
+    """
+    n = len(y_min)
+    if n_out is None or n <= n_out:
+        return np.arange(n), y_min, y_max
+    b = max(n_out // 2, 1)
+    size = -(-n // b)
+    b = -(-n // size)
+    pad = np.full(b * size - n, np.nan, dtype=y_min.dtype)
+    lo = np.concatenate([y_min, pad]).reshape(b, size)
+    hi = np.concatenate([y_max, pad]).reshape(b, size)
+    base = np.arange(b) * size
+    gap = np.concatenate([np.isnan(y_min), np.zeros(len(pad), dtype=bool)]).reshape(b, size).any(axis=1)
+    pos = np.concatenate([base, np.minimum(base[gap] + size - 1, n - 1)])
+    order = np.argsort(pos, kind='stable')
+    nans = np.full(gap.sum(), np.nan, dtype=y_min.dtype)
+    return (pos[order], np.concatenate([np.fmin.reduce(lo, axis=1), nans])[order],
+            np.concatenate([np.fmax.reduce(hi, axis=1), nans])[order])
+
+
+def render(blob, outdir):
+    """
+    worker entry point
+    :return: formatted traceback or None
+    """
+    try:
+        validator = pickle.loads(blob)
+        validator.report.index = False
+        validator.draw_new(outdir)
+    except Exception:
+        return traceback.format_exc()
+    return None
+
+
+class Renderer:
+    '''
+    draws reports in worker processes while the bench moves on: a Validator whose Report has renderer=... hands a
+    snapshot of itself over in draw_new instead of drawing. one per session, i.e.
+        with Renderer() as renderer:
+            std.validator_opts = {'report': {'renderer': renderer}}
+            std.cpf(outdir, final)
+            std.vv_char1(outdir, final)
+    joins at the end of the with block, or with join(). reports failed by then raise RuntimeError at the end of the
+    with block, or are passed to log if it is already left by an exception
+    '''
+    def __init__(self, max_workers=None, log=print):
+        self.pool = ProcessPoolExecutor(max_workers=max_workers)
+        self.log = log
+        self.futs = []  # (report, validator, future)
+        self.outdirs = set()  # where slim reports go, their index is rebuilt in join
+
+    def submit(self, validator, outdir):
+        # pickled here, the procedure may go on with its validator. held until join, its spill files are read by
+        # the worker and removed once it is collected
+        self.futs.append((f'{outdir}{validator.proc}', validator,
+                          self.pool.submit(render, pickle.dumps(validator), outdir)))
+        if validator.report.kind == 'slim':
+            self.outdirs.add(outdir)
+
+    def join(self) -> dict:
+        """
+        wait for every submitted report
+        :return: {report: formatted traceback} of those that failed
+        """
+        errors = {}
+        for report, _, fut in self.futs:
+            try:
+                err = fut.result()
+            except Exception:
+                err = traceback.format_exc()
+            if err is not None:
+                errors[report] = err
+        self.futs = []
+        for outdir in self.outdirs:
+            write_index(outdir)
+        self.outdirs = set()
+        return errors
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        errors = self.join()
+        self.close()
+        if not errors:
+            return
+        if exc_type is None:
+            raise RuntimeError('reports failed: ' + ', '.join(errors) + '\n' + '\n'.join(errors.values()))
+        # do not mask the exception leaving the block
+        for report, err in errors.items():
+            self.log(f'{report} failed\n{err}')
+
+
+def _index(t_ns, tz):
+    t = pd.to_datetime(t_ns, unit='ns', utc=tz is not None)
+    return pd.DatetimeIndex(t if tz is None else t.tz_convert(tz))
+
+
+class Report:
+    '''
+    how a Validator draws its report in draw_new.
+    kind 'html': self contained {proc}.html, 'slim': see write_slim.
+    traces drawn with more than gl_points use WebGL. with max_points set, traces longer than that are decimated
+    (minmax_idx, band_decimate), off by default: the report may be the only copy of the data unless a capture keeps
+    it at full resolution.
+    renderer: Renderer drawing the report in the background, None to draw it in draw_new.
+    index: rebuild index.html after a slim report, off where reports are drawn in parallel and the join rebuilds it
+    '''
+    def __init__(self, kind='html', max_points=None, gl_points=20_000, renderer=None, index=True):
+        self.kind = kind
+        self.max_points = max_points
+        self.gl_points = gl_points
+        self.renderer = renderer
+        self.index = index
+
+    def __getstate__(self):
+        # the renderer stays with the session, a snapshot only draws
+        state = self.__dict__.copy()
+        state['renderer'] = None
+        return state
+
+    def _scatter(self, n, **kwargs):
+        go = _plotly().graph_objs
+        if n > self.gl_points:
+            kwargs.pop('hoveron', None)
+            return go.Scattergl(**kwargs)
+        return go.Scatter(**kwargs)
+
+    def _draw_pqvf(self, validator, fig):
+        # each trace filled epoch by epoch into one array, no concatenated copy of all measurements
+        store = validator.store
+        n = sum(store.n_rows)
+        tz = None
+        t = np.empty(n, dtype=np.int64)
+        ys = {trace: np.full(n, np.nan) for trace in ['P', 'Q', 'V', 'F']}
+        i = 0
+        for df_meas, _ in store.iter_meas():
+            m = len(df_meas)
+            tz = df_meas.index.tz
+            t[i:i + m] = df_meas.index.as_unit('ns').asi8
+            for trace, y in ys.items():
+                if trace in df_meas:
+                    y[i:i + m] = df_meas[trace].to_numpy()
+            i += m
+        index = _index(t, tz)
         dct_trace_template = {
             'P': "Value: %{y:.0f}",
             'Q': "Value: %{y:.0f}",
@@ -47,16 +313,41 @@ class Validator:
             'F': "Value: %{y:.2f}",
         }
         for trace in ['P', 'Q', 'V', 'F']:
+            idx = minmax_idx(ys[trace], self.max_points)
             fig.add_trace(
-                go.Scatter(
-                    x=df_meas.index, y=df_meas[trace], name=trace, mode='lines', opacity=.5,
+                self._scatter(
+                    len(idx), x=index[idx], y=ys[trace][idx], name=trace, mode='lines', opacity=.5,
                     hovertemplate=dct_trace_template[trace],
                     yaxis=dct_trace_order[trace]
                 ),
             )
 
-    def _draw_crit(self, fig):
-        dct_lst_df_crit = self.crit
+    def _env_band(self, validator, trace):
+        """
+        per sample envelopes of trace over all epochs, NaN rows between epochs so the band is not bridged
+        :return: df ts-index min targ max, None if no epoch has one
+        """
+        store = validator.store
+        n = sum(m + 1 for m, keys in zip(store.n_rows, store.env_keys) if trace in keys)
+        if not n:
+            return None
+        t = np.empty(n, dtype=np.int64)
+        band = np.full((3, n), np.nan, dtype=np.float32)
+        i, tz = 0, None
+        for df_meas, envs in store.iter_meas():
+            if trace not in envs:
+                continue
+            m = len(df_meas)
+            tz = df_meas.index.tz
+            t[i:i + m] = df_meas.index.as_unit('ns').asi8
+            t[i + m] = t[i + m - 1]
+            band[:, i:i + m] = envs[trace]
+            i += m + 1
+        return pd.DataFrame({'min': band[0], 'targ': band[1], 'max': band[2]}, index=_index(t, tz))
+
+    def _draw_crit(self, validator, fig):
+        go = _plotly().graph_objs
+        dct_lst_df_crit = validator.crit
         for trace, lst in dct_lst_df_crit.items():
             if len(lst) == 0:
                 continue
@@ -77,79 +368,75 @@ class Validator:
                     yaxis=dct_trace_order[trace]
                 ),
             )
+            # continuous band where validators supplied per sample envelopes, else between the criteria points
+            df_band = self._env_band(validator, trace)
+            if df_band is None:
+                df_band = df
+            idx, y_min, y_max = band_decimate(df_band['min'].to_numpy(), df_band['max'].to_numpy(), self.max_points)
+            x = df_band.index[idx]
             fig.add_trace(
-                go.Scatter(
-                    x=df.index,
-                    y=df['min'],
+                self._scatter(
+                    len(idx),
+                    x=x,
+                    y=y_min,
                     name=f'{trace} max', mode='lines', opacity=.2, hoveron="points",
                     line_color="rgba(0, 0, 0, 0.2)", hovertemplate="Value: %{y:.0f}",
                     yaxis=dct_trace_order[trace]
                 ),
             )
             fig.add_trace(
-                go.Scatter(
-                    x=df.index,
-                    y=df['max'],
+                self._scatter(
+                    len(idx),
+                    x=x,
+                    y=y_max,
                     name=f'{trace} min', mode='lines', opacity=.2, hoveron="points", fill='tonexty',
                     fillcolor='rgba(0, 0, 0, 0.1)', line_color="rgba(0, 0, 0, 0.2)", hovertemplate="Value: %{y:.0f}",
                     yaxis=dct_trace_order[trace]
                 ),
             )
 
-    def _draw_epochs(self, fig, domains):
-        lst_epochs = self.epochs
-        for epoch in lst_epochs:
+    def _draw_epochs(self, validator, fig, domains):
+        # plain dicts assigned in one go, add_shape/add_annotation re-validate the layout on every call.
+        # nested dicts rather than magic underscores (line_width), which plotly resolves path by path
+        shapes, annotations = [], []
+        # labels are joined here, not while recording
+        for epoch in validator.epochs:
             start = epoch['start']
             end = epoch['end']
-            label = epoch['label']
-            passed = epoch['passed']
-            fillcolor = boolean_palette[passed]
-            fig.add_shape(
-                type="rect",
-                x0=start, x1=end, y0=domains['y1d'][0], y1=domains['y1d'][1],
-                line_width=0.2,
-                fillcolor=fillcolor,
-                yref="paper"
-            )
-            fig.add_shape(
-                type="rect",
-                x0=start, x1=end, y0=domains['y2d'][0], y1=domains['y2d'][1],
-                line_width=0.2,
-                fillcolor=fillcolor,
-                yref="paper"
-            )
-            fig.add_shape(
-                type="rect",
-                x0=start, x1=end, y0=domains['y3d'][0], y1=domains['y3d'][1],
-                line_width=0.2,
-                fillcolor=fillcolor,
-                yref="paper"
-            )
-            fig.add_shape(
-                type="rect",
-                x0=start, x1=end, y0=domains['y4d'][0], y1=domains['y4d'][1],
-                line_width=0.2,
-                fillcolor=fillcolor,
-                yref="paper"
-            )
-            fig.add_annotation(
-                x=start, y=domains['y1d'][1], yref="paper", text=label,
+            fillcolor = boolean_palette[epoch['passed']]
+            for y in ('y1d', 'y2d', 'y3d', 'y4d'):
+                shapes.append(dict(
+                    type="rect",
+                    x0=start, x1=end, y0=domains[y][0], y1=domains[y][1],
+                    line=dict(width=0.2),
+                    fillcolor=fillcolor,
+                    yref="paper"
+                ))
+            annotations.append(dict(
+                x=start, y=domains['y1d'][1], yref="paper", text=epoch['label'],
                 textangle=90, showarrow=False, xanchor="left", yanchor="top"
-            )
+            ))
+        fig.update_layout(shapes=shapes, annotations=annotations)
 
-    def draw_new(self, outdir):
+    def draw(self, validator, outdir):
+        if self.renderer is not None:
+            self.renderer.submit(validator, outdir)
+            return
+        plotly = _plotly()
+        go = plotly.graph_objs
+        proc = validator.proc
         pq_heights = [0.35, 0.35, 0.15, 0.15]
         p_heights = [0.55, 0.15, 0.15, 0.15]
         q_heights = [0.15, 0.55, 0.15, 0.15]
-        if self.proc in ['cpf', 'crp', 'wv', 'vv', 'vv-vref']:
+        if proc in ['cpf', 'crp', 'wv', 'vv', 'vv-vref']:
             heights = q_heights
-        elif self.proc in ['lap', 'vw', 'vw-1pu', 'vw-pu66', 'vw-pu20', 'fwo', 'fwu']:
+        elif proc in ['lap', 'vw', 'vw-1pu', 'vw-pu66', 'vw-pu20', 'fwo', 'fwu']:
             heights = p_heights
         else:
             heights = pq_heights
 
         # get domain size
-        fig = make_subplots(
+        fig = plotly.subplots.make_subplots(
             rows=4, cols=1, shared_xaxes=True, row_heights=heights)
         domains = dict(
             y1d=fig.layout.yaxis.domain,
@@ -161,7 +448,7 @@ class Validator:
         # make subplots using go.Figure - make subplots don't work with hover subplots
         layout = dict(
             grid=dict(rows=4, columns=1),
-            title=self.proc.upper(),
+            title=proc.upper(),
             plot_bgcolor='rgba(245, 245, 245)',
             # hoversubplots="axis",
             hovermode="x",
@@ -174,11 +461,172 @@ class Validator:
         )
         fig = go.Figure(layout=layout)
 
-        # self.epochs = []  # {'start': ts, 'end': ts, 'label': string, 'passed': bool}
-        # self.meas = []  # df ts-index P Q V F
-        # self.crit = {}  # one or multiple of P, Q, V, F. df ts-index min targ max
-        self._draw_pqvf(fig)
-        self._draw_crit(fig)
-        self._draw_epochs(fig, domains)
+        # validator.epochs = []  # {'start': ts, 'end': ts, 'label': string, 'passed': bool}
+        # validator.store.meas = []  # df ts-index P Q V F
+        # validator.crit = {}  # one or multiple of P, Q, V, F. df ts-index min targ max
+        self._draw_pqvf(validator, fig)
+        self._draw_crit(validator, fig)
+        self._draw_epochs(validator, fig, domains)
+
+        if self.kind == 'slim':
+            write_slim(fig, outdir, proc)
+            if self.index:
+                write_index(outdir)
+        else:
+            plotly.offline.plot(fig, filename=f'{outdir}{proc}.html')
+
+
+class Validator:
+    def __init__(self, proc, store: MeasStore = None, report: Report = None, checkpoint=None, replay_from=None,
+                 on_epoch=None):
+        """
+        :param store: where the measurements of the epochs go, a MeasStore(proc) in memory by default
+        :param report: drawn by draw_new, None for no report
+        """
+        self.proc = proc
+        self.store = MeasStore(proc) if store is None else store
+        self.report = report
+        self.on_epoch = on_epoch  # called with each recorded epoch, see pyUL1741SB.plan
+
+        # checkpoint: directory where every completed step is appended to {proc}.ckpt.
+        # when one exists the run resumes: measurements of completed steps are replayed in order
+        # (see IEEE1547.replay) instead of measured again, as long as they were recorded for the same steps.
+        # complete() sets it aside as {proc}.ckpt.done once the procedure has run to its end
+        self.ckpt = None
+        self.replay_q = deque()  # (step, df_meas), step is None for measurements replayed from a capture
+        self.n_replay = 0  # epochs restored from the checkpoint, not written again
+        self.step = None  # identity of the measurement in progress, see replay
+        self.pending = []  # (step, df_meas) of the step in progress
+        if checkpoint is not None:
+            self.ckpt = f'{checkpoint}{proc}.ckpt'
+            recs = load_checkpoint(self.ckpt)
+            for rec in recs:
+                # records without steps can't be matched, replay stops at the first
+                self.replay_q.extend(zip(rec.get('steps', [None] * len(rec['meas'])), rec['meas']))
+            self.n_replay = len(recs)
+            write_checkpoint(self.ckpt, recs)
+
+        # replay_from: capture file of an earlier run, every step is replayed from it and none is measured,
+        # see pyUL1741SB.replay. the run ends with CaptureExhausted where the capture does
+        self.offline = replay_from is not None
+        if self.offline:
+            with Capture(replay_from) as cap:
+                self.replay_q.extend((None, df) for df in cap.segments())
+        self.segs = []  # (rows, attrs) of every measurement of the step in progress
+
+        # epochs[k]: {'start': ts, 'end': ts, 'label': string, 'passed': bool, 'stop': None or string,
+        #  'violation': ts of the first sample outside its envelope or None, ...}, see EpochTable
+        self.epochs = EpochTable(proc)
+        # one or multiple of P, Q, V, F. df ts-index min targ max
+        self.crit = {c: [] for c in ['P', 'Q', 'V', 'F']}
+        # the Env's MeasBuffer, set by IEEE1547.new_validator: epochs keep their own copy of their rows and the
+        # buffer is cleared once each epoch is recorded, so neither grows with the length of the run
+        self.mbuf = None
+
+    def record_epoch(self, df_meas, dct_crits, dct_envs=None, fields=None, checks=None, **kwargs):
+        """
+        :param dct_envs: {trace: (min, targ, max)}, tolerance band at every sample of df_meas
+        :param fields: step identity, i.e. dct_label
+        :param checks: {name: passed or (passed, margin)}, see crit.margin
+        """
+        # rows of the epoch in the run's measurements, the Env's buffer is cleared below
+        i0 = sum(self.store.n_rows)
+        if isinstance(df_meas, EpochView):
+            df_meas = df_meas.df
+        # owned, a view would keep the buffer's arrays alive after the epoch spills
+        attrs = df_meas.attrs
+        df_meas = df_meas.copy()
+        df_meas.attrs = attrs
+        for c in dct_crits:
+            self.crit[c].append(dct_crits[c])
+        envs = {}
+        violation = None
+        for c, (y_min, y_targ, y_max) in (dct_envs or {}).items():
+            # first violation from full precision values, the band is kept as float32
+            y = df_meas[c].to_numpy()
+            i = crit.first_violation(y, y_min, y_max)
+            if i is not None and (violation is None or df_meas.index[i] < violation):
+                violation = df_meas.index[i]
+            envs[c] = np.array(np.broadcast_arrays(y_min, y_targ, y_max, y)[:3], dtype=np.float32)
+        segs = self.segs if sum(n for n, _ in self.segs) == len(df_meas) else [(len(df_meas), df_meas.attrs)]
+        self.store.append(df_meas, envs, segs)
+        if fields is None:
+            # label string of older validators
+            fields = dict(kv.split(': ', 1) for kv in kwargs.get('label', '').split('; ') if ': ' in kv)
+        checks = {} if checks is None else checks
+        self.epochs.append(
+            fields, checks,
+            start=kwargs['start'],
+            end=kwargs['end'],
+            i0=i0,
+            i1=i0 + len(df_meas),
+            passed=bool(kwargs['passed']),
+            # why the measurement window ended, set by IEEE1547.meas_perturb when early stop is allowed
+            stop=df_meas.attrs.get('stop'),
+            violation=violation,
+        )
+        if self.on_epoch is not None:
+            self.on_epoch(self.epochs[-1])
+        if self.ckpt is not None and len(self.epochs) > self.n_replay:
+            with open(self.ckpt, 'ab') as f:
+                pickle.dump({'meas': [df for _, df in self.pending], 'steps': [step for step, _ in self.pending],
+                             'epoch': self.epochs[-1]}, f)
+                f.flush()
+                os.fsync(f.fileno())
+        self.pending = []
+        self.segs = []
+        if self.mbuf is not None:
+            self.mbuf.clear(1024)
+
+    def note_meas(self, df_meas):
+        # raw measurement of the step in progress: checkpointed with its epoch, and its extent captured so a replay
+        # hands it back as it was measured
+        self.segs.append((len(df_meas), dict(df_meas.attrs)))
+        if self.ckpt is not None:
+            self.pending.append((self.step, df_meas.df if isinstance(df_meas, EpochView) else df_meas))
+
+    def replay(self, step=None):
+        """
+        :param step: the step the measurement is for, i.e. its dct_label. together with the number of measurements
+            already taken for the step it identifies the measurement, a checkpoint replays only while its records
+            were made for the same measurements
+        :return: recorded df_meas, None if the measurement has to be taken
+        """
+        self.step = (tuple(step.items()) if isinstance(step, dict) else step, len(self.pending))
+        if self.replay_q:
+            rec_step, df = self.replay_q[0]
+            if self.offline or rec_step == self.step:
+                self.replay_q.popleft()
+                self.segs.append((len(df), dict(df.attrs)))
+                if self.ckpt is not None:
+                    self.pending.append((self.step, df))
+                return df
+            self._diverge()
+        if self.offline:
+            raise CaptureExhausted(self.proc)
+        return None
+
+    def _diverge(self):
+        # this run left the recorded steps: keep the records of the epochs replayed so far, measure from here on
+        self.replay_q.clear()
+        self.n_replay = len(self.epochs)
+        write_checkpoint(self.ckpt, load_checkpoint(self.ckpt)[:self.n_replay])
 
-        plotly.offline.plot(fig, filename=f'{outdir}{self.proc}.html')
+    def complete(self):
+        # the procedure ran to its end, a later run starts over instead of resuming
+        if self.ckpt is not None and os.path.exists(self.ckpt):
+            os.replace(self.ckpt, f'{self.ckpt}.done')
+
+    def __getstate__(self):
+        # a pickled Validator takes its store, see MeasStore.__getstate__. callbacks stay with the session
+        state = self.__dict__.copy()
+        state['mbuf'], state['on_epoch'] = None, None
+        return state
+
+    def close(self):
+        self.store.close()
+
+    def draw_new(self, outdir):
+        self.close()
+        if self.report is not None:
+            self.report.draw(self, outdir)
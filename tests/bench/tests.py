@@ -0,0 +1,74 @@
+import sys
+import subprocess
+import pandas as pd
+import plotly.graph_objs as go
+from pyUL1741SB.viz import Validator, Report
+
+domains = dict(y1d=(0, .25), y2d=(.25, .5), y3d=(.5, .75), y4d=(.75, 1))
+
+
+def validator(n):
+    # epochs only, as a long trip repeat run leaves them
+    validator = Validator('ovt')
+    t0 = pd.Timestamp('2024-01-01', tz='UTC')
+    for k in range(n):
+        t = t0 + pd.Timedelta(seconds=k)
+        validator.epochs.append({'proc': 'ovt', 'iter': k}, {'valid': k % 3 > 0},
+                                start=t, end=t + pd.Timedelta(seconds=0.5), passed=k % 3 > 0)
+    return validator
+
+
+def draw_epochs(n, monkeypatch):
+    """
+    :return: layout objects validated while drawing n epochs, quadratic if each shape re-validates the ones before
+    """
+    built = []
+    for cls in (go.layout.Shape, go.layout.Annotation):
+        def init(self, *args, orig=cls.__init__, **kwargs):
+            built.append(type(self).__name__)
+            orig(self, *args, **kwargs)
+        monkeypatch.setattr(cls, '__init__', init)
+    v = validator(n)
+    fig = go.Figure()
+    Report()._draw_epochs(v, fig, domains)
+    monkeypatch.undo()
+    assert len(fig.layout.shapes) == 4 * n and len(fig.layout.annotations) == n
+    return len(built)
+
+
+class TestDrawEpochs:
+    def test_linear(self, monkeypatch):
+        # one validation per shape and annotation
+        assert draw_epochs(1000, monkeypatch) == 5 * 1000
+        assert draw_epochs(10000, monkeypatch) == 5 * 10000
+
+
+def import_s(stmt):
+    """
+    :return: (seconds, plotly loaded, pandas loaded) of stmt in a fresh interpreter, as a worker process starts
+    """
+    code = (f'import sys, time; t = time.perf_counter(); {stmt}; dt = time.perf_counter() - t; '
+            f'print(dt, "plotly" in sys.modules, "pandas" in sys.modules)')
+    dt, plotly, pandas = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                        check=True).stdout.split()
+    return float(dt), plotly == 'True', pandas == 'True'
+
+
+class TestImport:
+    def test_lazy(self):
+        t_pkg, plotly, pandas = import_s('import pyUL1741SB')
+        assert not plotly and not pandas
+        t_eut, plotly, pandas = import_s('from pyUL1741SB import Eut')
+        assert not plotly and not pandas
+        t_std, plotly, pandas = import_s('from pyUL1741SB import UL1741SB')
+        assert not plotly and pandas
+        # the package and Eut skip pandas, plotly and the procedures
+        assert t_pkg < t_std
+        assert t_eut < t_std
+
+    def test_subpackage_import(self):
+        # the subpackage module bound by the import does not shadow the class
+        code = ('import pyUL1741SB.IEEE1547.crit; from pyUL1741SB import IEEE1547; import pyUL1741SB; '
+                'print(isinstance(IEEE1547, type), pyUL1741SB.IEEE1547 is IEEE1547)')
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        assert out.split() == ['True', 'True']
@@ -1,6 +1,8 @@
+import numpy as np
 import pandas as pd
 import datetime as dt
 from pyUL1741SB import Env
+from pyUL1741SB.meas import MeasBuffer, td_ns
 from DercEut import DercEut
 
 
@@ -24,7 +26,6 @@ class DercEnv(Env):
     def meas(self):
         v = self.eut.current_input.v * self.eut.VN
         data = {
-            'time': self.time,
             'F': self.eut.current_input.f,
             'P': self.eut.p_out_w,
             'Q': self.eut.q_out_var,
@@ -32,22 +33,37 @@ class DercEnv(Env):
         }
         return data
 
-    def meas_single(self, *args) -> pd.DataFrame:
-        dct = self.meas()
+    def meas_row(self, *args) -> int:
+        i = self.mbuf.append(self.time, **self.meas())
         self.eut.run_step(dt=0.01)
         self.time += dt.timedelta(seconds=0.01)
-        df = pd.DataFrame([dct]).set_index('time').loc[:, [*args]]
-        return df
+        return i
+
+    def meas_into(self, buf: MeasBuffer, n: int, tres: dt.timedelta, *args):
+        # sample k is the output before step k*every, P and Q recorded by run_steps into arrays
+        if n <= 0:
+            return len(buf), len(buf)
+        # the controller steps in 1 ms, samples fall on whole steps
+        every = int(round(tres.total_seconds()/1e-3))
+        if every < 1:
+            raise ValueError(f'DercEnv samples at 1 ms or slower, got tres={tres}')
+        p, q = np.empty(n, dtype=np.float32), np.empty(n, dtype=np.float32)
+        p[0], q[0] = self.eut.current_cmd.p, self.eut.current_cmd.q
+        self.eut.run_steps((n - 1) * every, p_out=p[1:], q_out=q[1:], every=every)
+        self.eut.run_step(dt=tres.total_seconds())
+        t_ns = buf.ns(self.time) + np.arange(n, dtype=np.int64) * td_ns(tres)
+        self.time += n * tres
+        return buf.extend(
+            t_ns,
+            F=np.full(n, self.eut.current_input.f),
+            P=p.astype(np.float64) * self.eut.Srated,
+            Q=q.astype(np.float64) * self.eut.Srated,
+            V=np.full(n, self.eut.current_input.v * self.eut.VN),
+        )
 
     def meas_for(self, dur: dt.timedelta, tres: dt.timedelta, *args) -> pd.DataFrame:
-        start = self.time
-        dfs = []
-        while self.time - start < dur:
-            dfs.append(self.meas())
-            self.eut.run_step(dt=tres.total_seconds())
-            self.time += tres
-        df = pd.DataFrame(dfs).set_index('time').loc[:, [*args]]
-        return df
+        i0, i1 = self.meas_into(self.mbuf, -(-dur // tres), tres, *args)
+        return self.mbuf.df(i0, i1, args)
 
     def log(self, **kwargs):
         print(kwargs['msg'])
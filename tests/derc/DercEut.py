@@ -5,6 +5,8 @@ from pyUL1741SB.eut import VoltShallTripTable, FreqShallTripTable
 # Load DLL
 derc = CDLL(rf'tests/derc/derc.dll')
 
+
+
 # Structures matching derc.h
 
 
@@ -233,6 +235,9 @@ class DercEut(Eut):
         self.current_cmd = DerCCmd(p=0, q=0, poc=0)
         self.current_input = DerCInput(v=1.0, f=60.0, aap_inj=2.0, aap_abs=-2.0, sap=1.0)
 
+        # no snapshot(): the controller's filter and timer state is internal to the library and derc.h exposes no
+        # way to save or load it, so settle and trip repeats run in full
+
     def dc_config(self, **kwargs):
         pass
 
@@ -376,13 +381,35 @@ class DercEut(Eut):
                 raise NotImplementedError
 
     def run_step(self, dt=0.1, fault=False):
-        for i in range(int(round(dt/1e-3))):
-            derc.derc_step(
-                byref(self.current_input),
-                1e-3,
-                fault,
-                byref(self.current_cmd)
-            )
+        self.run_steps(int(round(dt/1e-3)), fault=fault)
+
+    def run_steps(self, n, dt=1e-3, fault=False, p_out=None, q_out=None, poc_out=None, every=1):
+        """
+        advance the controller n steps of dt seconds. derc.h exports derc_step only, so this is one foreign call
+        per step as in run_step; between calls there is nothing but the call
+        :param p_out, q_out, poc_out: optional float32/float32/int32 buffers of length n // every,
+            filled with the command after every `every`-th step
+        """
+        if every < 1:
+            raise ValueError(f'every must be at least 1, got {every}')
+        # bound once
+        step, pin, pcmd = derc.derc_step, byref(self.current_input), byref(self.current_cmd)
+        cmd = self.current_cmd
+        if p_out is None and q_out is None and poc_out is None:
+            for _ in range(n):
+                step(pin, dt, fault, pcmd)
+            return
+        for j in range(n // every):
+            for _ in range(every):
+                step(pin, dt, fault, pcmd)
+            if p_out is not None:
+                p_out[j] = cmd.p
+            if q_out is not None:
+                q_out[j] = cmd.q
+            if poc_out is not None:
+                poc_out[j] = cmd.poc
+        for _ in range(n % every):
+            step(pin, dt, fault, pcmd)
 
     @property
     def p_out_w(self):
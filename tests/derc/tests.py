@@ -111,3 +111,4 @@ class TestRidethrough:
 
     def test_hfrt(self, std):
         std.hfrt(outdir, final)
+
@@ -1,6 +1,7 @@
 import pandas as pd
 import datetime as dt
-from pyUL1741SB import Eut, Env
+from pyUL1741SB import Env
+from pyUL1741SB.meas import MeasBuffer
 from EpriEut import EpriEut
 import opender as der
 
@@ -31,7 +32,6 @@ class EpriEnv(Env):
         v = self.eut.der.der_input.v_meas_pu * self.eut.der.der_file.NP_AC_V_NOM
         # s = (self.eut.der.der_output.p_out_w**2 + self.eut.der.der_output.q_out_var**2) ** 0.5
         data = {
-            'time': self.time,
             'F': self.eut.der.der_input.freq_hz,
             'P': self.eut.der.der_output.p_out_w,
             'Q': self.eut.der.der_output.q_out_var,
@@ -40,27 +40,27 @@ class EpriEnv(Env):
         }
         return data
 
-    def meas_single(self, *args) -> pd.DataFrame:
-        dct = self.meas()
+    def meas_row(self, *args) -> int:
+        i = self.mbuf.append(self.time, **self.meas())
         der.DER.t_s = 0.01
-        df = pd.DataFrame([dct]).set_index('time').loc[:, [*args]]
         self.time += dt.timedelta(seconds=0.01)
         self.eut.der.run()
         der.DER.t_s = DTS
-        return df
+        return i
 
-    def meas_for(self, dur: dt.timedelta, tres: dt.timedelta, *args) -> pd.DataFrame:
-        start = self.time
-        dfs = []
+    def meas_into(self, buf: MeasBuffer, n: int, tres: dt.timedelta, *args):
+        i0 = len(buf)
         der.DER.t_s = tres.total_seconds()
-
-        while self.time - start < dur:
-            dfs.append(self.meas())
+        for i in range(n):
+            buf.append(self.time, **self.meas())
             self.eut.der.run()
             self.time += tres
-        df = pd.DataFrame(dfs).set_index('time').loc[:, [*args]]
         der.DER.t_s = DTS
-        return df
+        return i0, len(buf)
+
+    def meas_for(self, dur: dt.timedelta, tres: dt.timedelta, *args) -> pd.DataFrame:
+        i0, i1 = self.meas_into(self.mbuf, -(-dur // tres), tres, *args)
+        return self.mbuf.df(i0, i1, args)
 
     def log(self, **kwargs):
         print(kwargs['msg'])
@@ -4,6 +4,7 @@ from pyUL1741SB.IEEE1547.VoltReg.wv import WVCurve
 from pyUL1741SB.IEEE1547.FreqSupp import FWChar
 from pyUL1741SB import Eut, Env
 import opender as der
+import copy
 
 from pyUL1741SB.eut import VoltShallTripTable, FreqShallTripTable
 
@@ -53,6 +54,20 @@ class EpriEut(Eut):
             delta_Psmall=0.1,
         )
 
+    def snapshot(self):
+        return copy.deepcopy(self.der)
+
+    def restore(self, snap):
+        # copy again so the snapshot can be restored more than once
+        self.der = copy.deepcopy(snap)
+
+    def settle_key(self):
+        # every setting in the common file format, plus the inputs the env and set_aap apply
+        settings = tuple((k, repr(getattr(self.der.der_file, k))) for k in dir(self.der.der_file) if k.isupper())
+        inputs = tuple((k, repr(getattr(self.der.der_input, k, None))) for k in (
+            'v', 'v_a', 'v_b', 'v_c', 'theta', 'theta_a', 'theta_b', 'theta_c', 'freq_hz', 'p_dem_w'))
+        return settings, inputs
+
     def dc_config(self, **kwargs):
         pass
 